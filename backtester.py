@@ -4,17 +4,117 @@
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple
+import hashlib
 import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 import warnings
-warnings.filterwarnings('ignore')
 
 from config import BacktestConfig
 from portfolio_optimizer import PortfolioOptimizer
 from factor_calculator import FactorCalculator
+from jit import njit
 
 logger = logging.getLogger(__name__)
 
+# Weight changes smaller than this are not traded
+MIN_WEIGHT_CHANGE = 0.001
+
+@njit(cache=True, fastmath=True)
+def _execute_trades_nb(current_weights, new_weights, portfolio_value,
+                       transaction_cost, slippage):
+    """Trade values and costs for every position whose weight moves by at least 0.1%"""
+    weight_change = new_weights - current_weights
+    traded = np.flatnonzero(np.abs(weight_change) >= MIN_WEIGHT_CHANGE)
+    trade_values = weight_change[traded] * portfolio_value
+    trade_costs = np.abs(trade_values) * (transaction_cost + slippage)
+    return traded, trade_values, trade_costs, trade_costs.sum()
+
+def _first_of_period(dates: pd.DatetimeIndex, period_keys: np.ndarray) -> pd.DatetimeIndex:
+    """First date of each run of equal period keys (dates must be sorted)"""
+    mask = np.empty(len(dates), dtype=bool)
+    mask[:1] = True
+    np.not_equal(period_keys[1:], period_keys[:-1], out=mask[1:])
+    return dates[mask]
+
+def _rebalance_daily(dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    return dates
+
+def _rebalance_weekly(dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    # Every Monday
+    return dates[dates.weekday == 0]
+
+def _rebalance_monthly(dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    # First trading day of each month
+    return _first_of_period(dates, np.asarray(dates.year * 12 + dates.month))
+
+def _rebalance_quarterly(dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    # First trading day of each quarter
+    return _first_of_period(dates, np.asarray(dates.year * 4 + dates.quarter))
+
+_REBALANCE_RULES = {
+    'daily': _rebalance_daily,
+    'weekly': _rebalance_weekly,
+    'monthly': _rebalance_monthly,
+    'quarterly': _rebalance_quarterly,
+}
+
+# Covariance windows shared across backtests over the same price history
+# (parameter sweeps, optimizer comparisons), evicted least-recently-used
+_COVARIANCE_CACHE_SIZE = 4096
+_covariance_cache = OrderedDict()
+
+def _covariance_cache_get(key: tuple) -> Optional[np.ndarray]:
+    covariance = _covariance_cache.get(key)
+    if covariance is not None:
+        _covariance_cache.move_to_end(key)
+    return covariance
+
+def _covariance_cache_put(key: tuple, covariance: np.ndarray):
+    covariance.flags.writeable = False
+    _covariance_cache[key] = covariance
+    if len(_covariance_cache) > _COVARIANCE_CACHE_SIZE:
+        _covariance_cache.popitem(last=False)
+
+class RollingCovariance:
+    """Sliding-window sums of returns and their outer products
+    
+    Moving the window only adds the entering rows and removes the leaving ones,
+    so consecutive rebalances with overlapping lookbacks share most of the work.
+    """
+    
+    def __init__(self, returns: np.ndarray):
+        self.returns = returns
+        self.start = 0
+        self.end = 0
+        n_assets = returns.shape[1]
+        self.sum = np.zeros(n_assets)
+        self.sum_sq = np.zeros((n_assets, n_assets))
+        
+    def advance(self, start: int, end: int):
+        """Move the window to rows [start, end)"""
+        if start >= self.end:
+            # No overlap with the current window, rebuild from scratch
+            window = self.returns[start:end]
+            self.sum = window.sum(axis=0, dtype=np.float64)
+            self.sum_sq = (window.T @ window).astype(np.float64)
+        else:
+            entering = self.returns[self.end:end]
+            leaving = self.returns[self.start:start]
+            self.sum += entering.sum(axis=0, dtype=np.float64) - leaving.sum(axis=0, dtype=np.float64)
+            self.sum_sq += entering.T @ entering - leaving.T @ leaving
+            
+        self.start = start
+        self.end = end
+        
+    def annualized_cov(self, cols: List[int]) -> np.ndarray:
+        """Annualized sample covariance of the selected columns over the window"""
+        n = self.end - self.start
+        s = self.sum[cols]
+        return (self.sum_sq[np.ix_(cols, cols)] - np.outer(s, s) / n) / (n - 1) * 252
+
 class Backtester:
     """Walk-forward backtesting with transaction costs"""
     
@@ -42,118 +142,177 @@ class Backtester:
         current_weights = pd.Series(dtype=float)
         
         # Results storage
-        portfolio_values = []
         weights_history = []
         transactions = []
         
+        # Price matrix and daily returns, materialized once.
+        # Row i of R is the return earned from day i to day i+1.
+        # Returns are stored in float32 (estimation error in the covariance
+        # dwarfs the rounding); value compounding stays in float64.
+        dates = prices.index
+        tickers = prices.columns
+        n_days = len(prices)
+        P = prices.to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            raw_returns = (P[1:] / P[:-1] - 1).astype(np.float32)
+        R = np.where(np.isfinite(raw_returns), raw_returns, np.float32(0.0))  # Missing prices contribute no P&L
+        
+        # Trailing covariance is updated incrementally between rebalances;
+        # missing_count[i] counts missing returns per ticker before day i
+        rolling_cov = RollingCovariance(R)
+        missing_count = np.zeros((n_days, len(tickers)), dtype=np.int64)
+        np.cumsum(~np.isfinite(raw_returns), axis=0, out=missing_count[1:])
+        
+        # Fingerprint of the returns matrix for the covariance cache
+        returns_key = (raw_returns.shape,
+                       hashlib.blake2b(np.ascontiguousarray(raw_returns), digest_size=16).hexdigest())
+        
+        # Daily portfolio returns under the weights held between rebalances
+        # (filled one segment at a time), plus the fraction of portfolio
+        # value paid in trading costs on each rebalance day
+        daily_returns = np.zeros(len(R))
+        cost_fraction = np.zeros(len(R))
+        active_weights = np.zeros(len(tickers))
+        segment_start = 0
+        
+        # Number of positions held at the start of each day, keyed by first day held
+        held_from = [0]
+        held_counts = [0]
+        
         # Rebalancing dates
-        rebalance_dates = self._get_rebalance_dates(prices.index)
+        rebalance_dates = self._get_rebalance_dates(dates)
+        rebalance_positions = np.flatnonzero(dates.isin(rebalance_dates))
         
-        # Walk through time
-        for i, date in enumerate(prices.index):
-            # Record current value
-            portfolio_values.append({
-                'date': date,
-                'value': portfolio_value,
-                'weights': current_weights.to_dict()
-            })
+        # Scores aligned to the price matrix (NaN where a ticker is unscored)
+        score_matrix = self._align_scores(factor_scores, dates, tickers)
+        
+        # Pass 1: optimizer inputs for every rebalance date (cheap, sequential)
+        rebalance_points = []
+        expected_returns_list = []
+        covariance_list = []
+        for i in rebalance_positions:
+            if i >= n_days - 1:
+                break
+            date = dates[i]
             
-            # Check if rebalancing needed
-            if date in rebalance_dates and i < len(prices) - 1:
-                # Get factor scores for this date
-                if date not in factor_scores.index:
-                    continue
-                    
-                current_scores = factor_scores.loc[date]
-                
-                # Select top stocks based on composite score
-                # If factor_scores has multiple columns, use composite_score
-                if isinstance(current_scores, pd.DataFrame):
-                    if 'composite_score' in current_scores.columns:
-                        current_scores = current_scores['composite_score']
-                    else:
-                        # Use mean of all scores if no composite
-                        current_scores = current_scores.mean(axis=1)
-                
-                # Remove NaN values
-                current_scores = current_scores.dropna()
-                
-                n_stocks = min(30, len(current_scores))  # Max 30 stocks
-                if n_stocks == 0:
-                    continue
-                    
-                top_stocks = current_scores.nlargest(n_stocks).index
-                
-                # Calculate expected returns (using factor scores as proxy)
-                expected_returns = current_scores.loc[top_stocks]
-                
-                # Get historical data for covariance
-                lookback = 252  # 1 year
-                hist_start = max(0, i - lookback)
-                hist_prices = prices.iloc[hist_start:i+1][top_stocks]
-                
-                if len(hist_prices) < 60:  # Need at least 60 days
-                    continue
-                    
-                # Calculate covariance
-                returns = hist_prices.pct_change().dropna()
-                covariance = returns.cov() * 252  # Annualized
-                
-                # Optimize new weights
-                new_weights = optimizer.optimize_portfolio(
-                    expected_returns, 
-                    covariance,
-                    current_weights
-                )
-                
-                # Apply turnover constraint
-                new_weights = optimizer.apply_turnover_constraint(
-                    new_weights, 
-                    current_weights
-                )
+            # Rank tickers with a score on this date
+            current_scores = score_matrix[i]
+            scored = np.flatnonzero(~np.isnan(current_scores))
+            
+            n_stocks = min(30, len(scored))  # Max 30 stocks
+            if n_stocks == 0:
+                continue
                 
-                # Execute trades
-                trades, costs = self._execute_trades(
-                    current_weights,
-                    new_weights,
-                    prices.iloc[i],
-                    portfolio_value
-                )
+            # Quickselect the top n, then order just those highest-first
+            neg_scores = -current_scores[scored]
+            if n_stocks < len(scored):
+                top = np.sort(np.argpartition(neg_scores, n_stocks - 1)[:n_stocks])
+            else:
+                top = np.arange(len(scored))
+            cols = scored[top[np.argsort(neg_scores[top], kind='stable')]]
+            
+            # Calculate expected returns (using factor scores as proxy)
+            expected_returns = pd.Series(current_scores[cols], index=tickers[cols])
+            
+            # Get historical data for covariance
+            lookback = 252  # 1 year
+            hist_start = max(0, i - lookback)
+            
+            if i + 1 - hist_start < 60:  # Need at least 60 days
+                continue
                 
-                # Update portfolio
-                portfolio_value -= costs
-                current_weights = new_weights
-                weights_history.append({
-                    'date': date,
-                    'weights': new_weights.to_dict()
-                })
+            # Calculate covariance on complete rows of the trailing returns,
+            # reusing the result of an earlier run over the same window
+            cache_key = (returns_key, hist_start, i, tuple(cols))
+            covariance = _covariance_cache_get(cache_key)
+            if covariance is None:
+                rolling_cov.advance(hist_start, i)
+                if not (missing_count[i, cols] - missing_count[hist_start, cols]).any():
+                    covariance = rolling_cov.annualized_cov(cols)
+                else:
+                    hist_returns = raw_returns[hist_start:i, cols]
+                    hist_returns = hist_returns[np.isfinite(hist_returns).all(axis=1)]
+                    covariance = self._fast_annualized_cov(hist_returns)
+                _covariance_cache_put(cache_key, covariance)
                 
-                if trades:
-                    transactions.extend(trades)
-                    
-                logger.info(f"Rebalanced on {date}: {len(new_weights)} positions, costs: ${costs:.2f}")
+            rebalance_points.append((i, date))
+            expected_returns_list.append(expected_returns)
+            covariance_list.append(covariance)
+        
+        # Pass 2: optimize every rebalance independently (optionally in parallel)
+        # (SLSQP probes near-singular covariances and emits sqrt/divide noise)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            optimized_weights = self._optimize_rebalances(optimizer, expected_returns_list, covariance_list)
+        
+        # Pass 3: turnover, trades and costs in date order; P&L between
+        # rebalances is vectorized
+        for (i, date), new_weights in zip(rebalance_points, optimized_weights):
+            # Apply turnover constraint
+            new_weights = optimizer.apply_turnover_constraint(
+                new_weights, 
+                current_weights
+            )
+            
+            # Nothing to do if no position moves past the trading dead-band
+            target_weights = new_weights.reindex(tickers).fillna(0.0).to_numpy(dtype=np.float64)
+            if np.all(np.abs(target_weights - active_weights) < MIN_WEIGHT_CHANGE):
+                continue
+            
+            # Roll the portfolio value forward to today under the active weights
+            daily_returns[segment_start:i] = R[segment_start:i] @ active_weights
+            portfolio_value *= (1 - cost_fraction[segment_start]) * np.prod(1 + daily_returns[segment_start:i])
+            
+            # Execute trades
+            trades, costs = self._execute_trades(
+                active_weights,
+                target_weights,
+                P[i],
+                tickers,
+                portfolio_value
+            )
             
-            # Calculate daily P&L
-            if i < len(prices) - 1 and not current_weights.empty:
-                # Get returns
-                current_prices = prices.iloc[i]
-                next_prices = prices.iloc[i + 1]
+            # Update portfolio
+            cost_fraction[i] = costs / portfolio_value if portfolio_value else 0.0
+            current_weights = new_weights
+            active_weights = target_weights
+            segment_start = i
+            held_from.append(i + 1)
+            held_counts.append(len(new_weights))
+            weights_history.append({
+                'date': date,
+                'weights': new_weights.to_dict()
+            })
+            
+            if trades:
+                transactions.extend(trades)
                 
-                # Calculate weighted return
-                available_tickers = current_weights.index.intersection(current_prices.index)
-                if len(available_tickers) > 0:
-                    position_values = current_weights.loc[available_tickers] * portfolio_value
-                    price_returns = (next_prices.loc[available_tickers] / 
-                                   current_prices.loc[available_tickers] - 1)
-                    daily_pnl = (position_values * price_returns).sum()
-                    portfolio_value += daily_pnl
-        
-        # Create results DataFrame
-        portfolio_df = pd.DataFrame(portfolio_values)
-        portfolio_df.set_index('date', inplace=True)
+            logger.info("Rebalanced on %s: %d positions, costs: $%.2f", date, len(new_weights), costs)
+        
+        daily_returns[segment_start:] = R[segment_start:] @ active_weights
+        
+        # Compound the whole value path in one pass
+        growth = (1 - cost_fraction) * (1 + daily_returns)
+        values = np.empty(n_days)
+        values[:1] = self.config.initial_capital
+        np.cumprod(growth, out=values[1:])
+        values[1:] *= self.config.initial_capital
+        
+        # Map each day to the rebalance whose weights it starts with
+        held_idx = np.searchsorted(held_from, np.arange(n_days), side='right') - 1
+        
+        # Create results DataFrame (weight snapshots live in weights_history)
+        portfolio_df = pd.DataFrame({
+            'value': values,
+            'n_positions': np.asarray(held_counts)[held_idx]
+        }, index=dates)
+        portfolio_df.index.name = 'date'
         
         # Calculate metrics
-        metrics = self._calculate_metrics(portfolio_df, prices)
+        # (short or flat value paths give empty/degenerate reductions)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            metrics = self._calculate_metrics(portfolio_df, prices)
         
         return {
             'portfolio_values': portfolio_df,
@@ -162,72 +321,98 @@ class Backtester:
             'metrics': metrics
         }
     
-    def _get_rebalance_dates(self, dates: pd.DatetimeIndex) -> List[pd.Timestamp]:
-        """Get rebalancing dates based on frequency"""
-        rebalance_dates = []
-        
-        if self.config.rebalance_frequency == 'daily':
-            rebalance_dates = dates.tolist()
-        elif self.config.rebalance_frequency == 'weekly':
-            # Every Monday
-            rebalance_dates = [d for d in dates if d.weekday() == 0]
-        elif self.config.rebalance_frequency == 'monthly':
-            # First trading day of each month
-            rebalance_dates = dates.to_series().groupby(pd.Grouper(freq='M')).first().tolist()
-        elif self.config.rebalance_frequency == 'quarterly':
-            # First trading day of each quarter
-            rebalance_dates = dates.to_series().groupby(pd.Grouper(freq='Q')).first().tolist()
-            
-        return rebalance_dates
+    def _align_scores(self, factor_scores: pd.DataFrame,
+                      dates: pd.DatetimeIndex,
+                      tickers: pd.Index) -> np.ndarray:
+        """Collapse factor scores to one value per (date, ticker), aligned to the prices
+        
+        Wide (date x ticker) scores are used as-is. Long scores indexed by
+        (date, ticker) use composite_score, or the mean of all scores without one.
+        """
+        if isinstance(factor_scores.index, pd.MultiIndex):
+            if 'composite_score' in factor_scores.columns:
+                factor_scores = factor_scores['composite_score'].unstack()
+            else:
+                factor_scores = factor_scores.mean(axis=1).unstack()
+                
+        return factor_scores.reindex(index=dates, columns=tickers).to_numpy(dtype=np.float64)
     
-    def _execute_trades(self, current_weights: pd.Series, 
-                       new_weights: pd.Series,
-                       current_prices: pd.Series,
-                       portfolio_value: float) -> Tuple[List[Dict], float]:
-        """Execute trades and calculate costs"""
-        trades = []
-        total_costs = 0
+    def _optimize_rebalances(self, optimizer: PortfolioOptimizer,
+                             expected_returns_list: List[pd.Series],
+                             covariance_list: List[np.ndarray]) -> List[pd.Series]:
+        """Run the optimizer for each rebalance date
         
-        # Get all tickers
-        all_tickers = current_weights.index.union(new_weights.index)
+        Each solve depends only on its own scores and covariance, so with
+        n_jobs != 1 they are spread across a process pool. Serially, each
+        solve starts from the previous one's weights.
+        """
+        n_jobs = self.config.n_jobs
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(expected_returns_list))
         
-        for ticker in all_tickers:
-            current_weight = current_weights.get(ticker, 0)
-            new_weight = new_weights.get(ticker, 0)
+        if n_jobs <= 1:
+            # Serial solves warm-start from the previous rebalance's optimum
+            optimized, previous = [], None
+            for expected_returns, covariance in zip(expected_returns_list, covariance_list):
+                previous = optimizer.optimize_portfolio(expected_returns, covariance, previous)
+                optimized.append(previous)
+            return optimized
             
-            if abs(new_weight - current_weight) < 0.001:  # No significant change
-                continue
-                
-            if ticker not in current_prices.index:
-                logger.warning(f"No price for {ticker}, skipping trade")
-                continue
-                
-            price = current_prices[ticker]
-            
-            # Calculate shares to trade
-            current_value = current_weight * portfolio_value
-            new_value = new_weight * portfolio_value
-            trade_value = new_value - current_value
-            shares = trade_value / price
-            
-            # Transaction costs
-            trade_cost = abs(trade_value) * self.config.transaction_cost
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(
+                optimizer.optimize_portfolio,
+                expected_returns_list,
+                covariance_list,
+                chunksize=max(1, len(expected_returns_list) // (4 * n_jobs))
+            ))
+    
+    def _fast_annualized_cov(self, returns: np.ndarray) -> np.ndarray:
+        """Annualized sample covariance without materializing a centered copy"""
+        n = returns.shape[0]
+        if n < 2:
+            return np.full((returns.shape[1], returns.shape[1]), np.nan)
             
-            # Slippage
-            if trade_value > 0:  # Buying
-                slippage_cost = trade_value * self.config.slippage
-            else:  # Selling
-                slippage_cost = abs(trade_value) * self.config.slippage
-                
-            total_cost = trade_cost + slippage_cost
-            total_costs += total_cost
+        mu = returns.mean(axis=0)
+        cov = (returns.T @ returns) / (n - 1) - (n / (n - 1)) * np.outer(mu, mu)
+        return cov * 252
+    
+    def _get_rebalance_dates(self, dates: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        """Get rebalancing dates based on frequency"""
+        rebalance_rule = _REBALANCE_RULES.get(self.config.rebalance_frequency)
+        if rebalance_rule is None:
+            return dates[:0]
+        return rebalance_rule(dates)
+    
+    def _execute_trades(self, current_weights: np.ndarray, 
+                       new_weights: np.ndarray,
+                       current_prices: np.ndarray,
+                       tickers: pd.Index,
+                       portfolio_value: float) -> Tuple[List[Dict], float]:
+        """Execute trades and calculate costs
+        
+        Weights and prices are dense arrays aligned with ``tickers``.
+        """
+        if np.all(np.abs(new_weights - current_weights) < MIN_WEIGHT_CHANGE):
+            return [], 0.0
             
+        traded, trade_values, trade_costs, total_costs = _execute_trades_nb(
+            current_weights,
+            new_weights,
+            portfolio_value,
+            self.config.transaction_cost,
+            self.config.slippage
+        )
+        
+        trades = []
+        for j, trade_value, cost in zip(traded.tolist(), trade_values.tolist(), trade_costs.tolist()):
+            price = current_prices[j]
             trades.append({
-                'ticker': ticker,
-                'shares': shares,
+                'ticker': tickers[j],
+                'shares': trade_value / price,
                 'price': price,
                 'value': trade_value,
-                'cost': total_cost,
+                'cost': cost,
                 'type': 'BUY' if trade_value > 0 else 'SELL'
             })
             
@@ -237,35 +422,38 @@ class Backtester:
                           prices: pd.DataFrame) -> Dict:
         """Calculate performance metrics"""
         # Returns
-        returns = portfolio_df['value'].pct_change().dropna()
+        values = portfolio_df['value'].to_numpy(dtype=np.float64)
+        returns = np.diff(values) / values[:-1]
         
         # Annualized metrics
         trading_days = 252
+        annualizer = np.sqrt(trading_days)
         n_days = len(returns)
-        annualization_factor = trading_days / n_days
         
         # CAGR
-        total_return = portfolio_df['value'].iloc[-1] / portfolio_df['value'].iloc[0] - 1
+        total_return = values[-1] / values[0] - 1
         years = n_days / trading_days
         cagr = (1 + total_return) ** (1 / years) - 1 if years > 0 else 0
         
         # Volatility
-        volatility = returns.std() * np.sqrt(trading_days)
+        returns_std = returns.std(ddof=1)
+        volatility = returns_std * annualizer
         
         # Sharpe ratio
-        excess_returns = returns - self.config.risk_free_rate / trading_days
-        sharpe = np.sqrt(trading_days) * excess_returns.mean() / returns.std() if returns.std() > 0 else 0
+        excess_mean = returns.mean() - self.config.risk_free_rate / trading_days
+        sharpe = annualizer * excess_mean / returns_std if returns_std > 0 else 0
         
         # Sortino ratio
         downside_returns = returns[returns < 0]
-        downside_vol = downside_returns.std() * np.sqrt(trading_days)
-        sortino = np.sqrt(trading_days) * excess_returns.mean() / downside_returns.std() if len(downside_returns) > 0 else 0
+        sortino = annualizer * excess_mean / downside_returns.std(ddof=1) if len(downside_returns) > 0 else 0
         
-        # Maximum drawdown
-        cumulative = (1 + returns).cumprod()
-        running_max = cumulative.expanding().max()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min()
+        # Maximum drawdown (the compounded returns are just the value path,
+        # so the running peak is taken on the values directly)
+        if n_days > 0:
+            running_max = np.maximum.accumulate(values[1:])
+            max_drawdown = (values[1:] / running_max).min() - 1
+        else:
+            max_drawdown = np.nan
         
         # Calmar ratio
         calmar = cagr / abs(max_drawdown) if max_drawdown != 0 else 0
@@ -275,21 +463,22 @@ class Backtester:
         
         # Benchmark comparison
         if self.config.benchmark and self.config.benchmark in prices.columns:
-            benchmark_returns = prices[self.config.benchmark].pct_change().dropna()
-            benchmark_returns = benchmark_returns.loc[returns.index]
+            benchmark_prices = prices[self.config.benchmark].to_numpy(dtype=np.float64)
+            benchmark_returns = benchmark_prices[1:] / benchmark_prices[:-1] - 1
             
             # Information ratio
             active_returns = returns - benchmark_returns
-            tracking_error = active_returns.std() * np.sqrt(trading_days)
-            info_ratio = active_returns.mean() * trading_days / tracking_error if tracking_error > 0 else 0
+            tracking_error = np.nanstd(active_returns, ddof=1) * np.sqrt(trading_days)
+            info_ratio = np.nanmean(active_returns) * trading_days / tracking_error if tracking_error > 0 else 0
             
-            # Beta
-            covariance = returns.cov(benchmark_returns)
-            benchmark_variance = benchmark_returns.var()
-            beta = covariance / benchmark_variance if benchmark_variance > 0 else 1
+            # Beta (annualization cancels in the ratio)
+            paired = np.column_stack([returns, benchmark_returns])
+            paired = paired[np.isfinite(paired).all(axis=1)]
+            covariance = self._fast_annualized_cov(paired)
+            beta = covariance[0, 1] / covariance[1, 1] if covariance[1, 1] > 0 else 1
             
             # Alpha
-            alpha = cagr - (self.config.risk_free_rate + beta * (benchmark_returns.mean() * trading_days - self.config.risk_free_rate))
+            alpha = cagr - (self.config.risk_free_rate + beta * (np.nanmean(benchmark_returns) * trading_days - self.config.risk_free_rate))
         else:
             info_ratio = 0
             beta = 1
@@ -308,7 +497,7 @@ class Backtester:
             'beta': beta,
             'alpha': alpha,
             'n_trades': len([t for t in portfolio_df.get('transactions', [])]),
-            'avg_n_positions': np.mean([len(w.get('weights', {})) for _, w in portfolio_df.iterrows()])
+            'avg_n_positions': portfolio_df['n_positions'].mean()
         }
     
     def generate_report(self, results: Dict) -> str:
@@ -1,63 +1,105 @@
 # companies.py
 # Define stock tickers to analyze - Updated with 100+ Scandinavian companies
+# Lists are plain tuple literals of strings: the compiler folds them into constants
+# in the cached .pyc, which marshal loads in C without re-tokenizing this file.
+
+import os
+from functools import cache
+from sys import intern
+from types import MappingProxyType
+
+def _union(*lists):
+    """Concatenate ticker lists, dropping duplicates while preserving order"""
+    seen = set()
+    unique = []
+    for tickers in lists:
+        for ticker in tickers:
+            if ticker not in seen:
+                seen.add(ticker)
+                unique.append(ticker)
+    return tuple(unique)
+
+# Named universes already resolved through get_universe
+_universe_cache = {}
+
+def list_universes():
+    """Names of all ticker lists defined in this module"""
+    names = [name for name, value in globals().items()
+             if name.isupper() and isinstance(value, (list, tuple))]
+    return names + list(_COMBINED_UNIVERSES)
+
+def get_universe(name):
+    """Return the named ticker list as a tuple, memoized after the first lookup
+    
+    Tickers are interned so they are the canonical string objects process-wide.
+    """
+    if name not in _universe_cache:
+        if name in _COMBINED_UNIVERSES:
+            tickers = _COMBINED_UNIVERSES[name]()
+        else:
+            tickers = globals().get(name)
+        if not name.isupper() or not isinstance(tickers, (list, tuple)):
+            raise KeyError(f"Unknown ticker list: {name}")
+        _universe_cache[name] = tuple(map(intern, tickers))
+    return _universe_cache[name]
 
 # S&P 500 Tech Leaders
-TECH_LEADERS = [
+TECH_LEADERS = (
     'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'ADBE', 'CRM'
-]
+)
 
 # Financial Sector
-FINANCIALS = [
+FINANCIALS = (
     'JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'AXP', 'BLK', 'SCHW', 'USB'
-]
+)
 
 # Healthcare & Pharma
-HEALTHCARE = [
+HEALTHCARE = (
     'JNJ', 'PFE', 'UNH', 'ABBV', 'TMO', 'ABT', 'LLY', 'BMY', 'MRK', 'AMGN'
-]
+)
 
 # Consumer Discretionary
-CONSUMER_DISC = [
+CONSUMER_DISC = (
     'AMZN', 'TSLA', 'HD', 'MCD', 'NKE', 'SBUX', 'LOW', 'TJX', 'BKNG', 'CMG'
-]
+)
 
 # Energy Sector
-ENERGY = [
+ENERGY = (
     'XOM', 'CVX', 'COP', 'EOG', 'SLB', 'MPC', 'PSX', 'VLO', 'KMI', 'OKE'
-]
+)
 
 # Industrial Sector
-INDUSTRIALS = [
+INDUSTRIALS = (
     'BA', 'HON', 'UPS', 'CAT', 'MMM', 'GE', 'LMT', 'RTX', 'DE', 'UNP'
-]
+)
 
 # Dividend Aristocrats (High Quality Dividend Stocks)
-DIVIDEND_ARISTOCRATS = [
+DIVIDEND_ARISTOCRATS = (
     'JNJ', 'PG', 'KO', 'PEP', 'WMT', 'MCD', 'MMM', 'CVX', 'XOM', 'IBM'
-]
+)
 
 # Growth Stocks (Higher Beta/Volatility)
-GROWTH_STOCKS = [
+GROWTH_STOCKS = (
     'NVDA', 'AMD', 'TSLA', 'NFLX', 'AMZN', 'GOOGL', 'META', 'CRM', 'ADBE', 'PYPL'
-]
+)
 
 # Value Stocks (Traditionally Undervalued)
-VALUE_STOCKS = [
+VALUE_STOCKS = (
     'BRK-B', 'JPM', 'BAC', 'XOM', 'CVX', 'WFC', 'IBM', 'VZ', 'T', 'INTC'
-]
+)
 
 # Small Cap Growth (Russell 2000 examples)
-SMALL_CAP = [
+SMALL_CAP = (
     'ENPH', 'DXCM', 'ETSY', 'PENN', 'ROKU', 'ZM', 'PTON', 'CRWD', 'ZS', 'OKTA'
-]
+)
 
 # International ADRs
-INTERNATIONAL = [
+INTERNATIONAL = (
     'ASML', 'TSM', 'NVO', 'TM', 'BABA', 'JD', 'NIO', 'PDD', 'BIDU', 'TCEHY'
-]
+)
 
 # Mixed Portfolio (Recommended for beginners)
-BALANCED_PORTFOLIO = [
+BALANCED_PORTFOLIO = (
     # Large Cap Tech
     'AAPL', 'MSFT', 'GOOGL', 'AMZN',
     # Financial
@@ -74,22 +116,22 @@ BALANCED_PORTFOLIO = [
     'NVDA', 'TSLA',
     # Value
     'BRK-B', 'WMT'
-]
+)
 
 # Crypto/Blockchain Exposure
-CRYPTO_ADJACENT = [
+CRYPTO_ADJACENT = (
     'COIN', 'MSTR', 'SQ', 'PYPL', 'RIOT', 'MARA', 'HOOD', 'SOFI'
-]
+)
 
 # ESG/Clean Energy
-CLEAN_ENERGY = [
+CLEAN_ENERGY = (
     'TSLA', 'ENPH', 'SEDG', 'FSLR', 'PLUG', 'BE', 'ICLN', 'NEE', 'DUK', 'SO'
-]
+)
 
 # REITs (Real Estate)
-REITS = [
+REITS = (
     'SPG', 'PLD', 'AMT', 'CCI', 'EQIX', 'PSA', 'O', 'WELL', 'DLR', 'AVB'
-]
+)
 
 # =============================================================================
 # SCANDINAVIAN STOCK EXCHANGES - COMPREHENSIVE LISTS (100+ COMPANIES)
@@ -99,7 +141,7 @@ REITS = [
 # =============================================================================
 
 # OBX Index (Top 25 Norwegian Companies)
-OSLO_OBX_INDEX = [
+OSLO_OBX_INDEX = (
     'EQNR.OL',    # Equinor - Oil & Gas giant
     'DNB.OL',     # DNB Bank - Largest bank
     'MOWI.OL',    # Mowi - Salmon farming leader
@@ -125,10 +167,10 @@ OSLO_OBX_INDEX = [
     'KAHOT.OL',   # Kahoot - Educational technology
     'OTEC.OL',    # Otec - Technology
     'BOUVET.OL'   # Bouvet - IT consulting
-]
+)
 
 # Norwegian Energy & Maritime
-OSLO_ENERGY_MARITIME = [
+OSLO_ENERGY_MARITIME = (
     'EQNR.OL',    # Equinor
     'AKRBP.OL',   # Aker BP
     'OKEA.OL',    # OKEA ASA - Oil & gas
@@ -149,10 +191,10 @@ OSLO_ENERGY_MARITIME = [
     'SCATEC.OL',  # Scatec - Solar power
     'NEL.OL',     # Nel ASA - Hydrogen
     'HEX.OL'      # Hexagon Composites - Pressure vessels
-]
+)
 
 # Norwegian Seafood (World's largest seafood exporters)
-OSLO_SEAFOOD_AQUACULTURE = [
+OSLO_SEAFOOD_AQUACULTURE = (
     'MOWI.OL',    # Mowi - World's largest salmon farmer
     'SALM.OL',    # SalMar - Salmon farming
     'LSG.OL',     # Leroy Seafood Group
@@ -168,10 +210,10 @@ OSLO_SEAFOOD_AQUACULTURE = [
     'BEWI.OL',    # Bewi - EPS packaging for seafood
     'AKVA.OL',    # AKVA Group - Aquaculture technology
     'MASSON.OL'   # Masson - Aquaculture equipment
-]
+)
 
 # Norwegian Tech & Industrials
-OSLO_TECH_INDUSTRIALS = [
+OSLO_TECH_INDUSTRIALS = (
     'YAR.OL',     # Yara International - Fertilizers
     'NHY.OL',     # Norsk Hydro - Aluminum
     'KOG.OL',     # Kongsberg Gruppen - Defense tech
@@ -192,10 +234,10 @@ OSLO_TECH_INDUSTRIALS = [
     'AKER.OL',    # Aker ASA - Industrial investment
     'AMSC.OL',    # American Superconductor Norge
     'PROT.OL'     # Protector Forsikring - Insurance tech
-]
+)
 
 # Norwegian Financial Services
-OSLO_FINANCIALS = [
+OSLO_FINANCIALS = (
     'DNB.OL',     # DNB Bank - Largest bank
     'STB.OL',     # Storebrand - Insurance
     'GJF.OL',     # Gjensidige - Insurance
@@ -208,20 +250,19 @@ OSLO_FINANCIALS = [
     'PROT.OL',    # Protector Forsikring
     'GOODING.OL', # Goodtech - Financial tech
     'AEGA.OL'     # Aegon Asset Management
-]
+)
 
 # All Oslo Stock Exchange companies
-OSLO_ALL = (OSLO_OBX_INDEX + OSLO_ENERGY_MARITIME + OSLO_SEAFOOD_AQUACULTURE + 
-           OSLO_TECH_INDUSTRIALS + OSLO_FINANCIALS)
-
-# Remove duplicates while preserving order
-OSLO_ALL = list(dict.fromkeys(OSLO_ALL))
+@cache
+def oslo_all():
+    return _union(OSLO_OBX_INDEX, OSLO_ENERGY_MARITIME, OSLO_SEAFOOD_AQUACULTURE,
+                  OSLO_TECH_INDUSTRIALS, OSLO_FINANCIALS)
 
 # SWEDEN - Stockholm Stock Exchange (Nasdaq Stockholm)
 # =============================================================================
 
 # OMXS30 Index (Top 30 Swedish Companies) - Updated 2025
-STOCKHOLM_OMXS30 = [
+STOCKHOLM_OMXS30 = (
     'AZN.ST',     # AstraZeneca - Pharmaceuticals (largest by market cap)
     'ABB.ST',     # ABB - Industrial technology
     'INVE_B.ST',  # Investor AB - Investment company
@@ -252,10 +293,10 @@ STOCKHOLM_OMXS30 = [
     'SINCH.ST',   # Sinch - Communications platform
     'ELUX_B.ST',  # Electrolux B - Home appliances
     'SBB_B.ST'    # SBB B - Real estate
-]
+)
 
 # Swedish Industrials & Manufacturing (Global Leaders)
-STOCKHOLM_INDUSTRIALS_EXTENDED = [
+STOCKHOLM_INDUSTRIALS_EXTENDED = (
     'ABB.ST',     # ABB - Industrial automation
     'ATCO_A.ST',  # Atlas Copco A
     'ATCO_B.ST',  # Atlas Copco B
@@ -282,10 +323,10 @@ STOCKHOLM_INDUSTRIALS_EXTENDED = [
     'PEAB_B.ST',  # PEAB B - Construction
     'SKANSKA_B.ST', # Skanska B - Construction
     'NCC_B.ST'    # NCC B - Construction
-]
+)
 
 # Swedish Tech & Communications
-STOCKHOLM_TECH_TELECOM = [
+STOCKHOLM_TECH_TELECOM = (
     'ERIC_B.ST',  # Ericsson B - 5G leader
     'ERIC_A.ST',  # Ericsson A
     'TELIA.ST',   # Telia - Telecom operator
@@ -306,10 +347,10 @@ STOCKHOLM_TECH_TELECOM = [
     'NOTE.ST',    # Note - Electronics manufacturing
     'CLAVISTER.ST', # Clavister - Cybersecurity
     'ONECALL.ST'  # Onecall Group - Telecom services
-]
+)
 
 # Swedish Gaming & Entertainment
-STOCKHOLM_GAMING = [
+STOCKHOLM_GAMING = (
     'EVO.ST',     # Evolution - Live casino gaming
     'KINV_B.ST',  # Kinnevik B - Investments in gaming/media
     'MTG_B.ST',   # MTG B - Gaming & esports
@@ -320,10 +361,10 @@ STOCKHOLM_GAMING = [
     'GGBET.ST',   # Gaming innovation Group
     'STILLFRONT.ST', # Stillfront Group - Mobile gaming
     'G5EN.ST'     # G5 Entertainment - Mobile games
-]
+)
 
 # Swedish Healthcare & Life Sciences
-STOCKHOLM_HEALTHCARE = [
+STOCKHOLM_HEALTHCARE = (
     'AZN.ST',     # AstraZeneca - Global pharma leader
     'ESSITY_B.ST', # Essity B - Hygiene & health
     'ESSITY_A.ST', # Essity A
@@ -339,10 +380,10 @@ STOCKHOLM_HEALTHCARE = [
     'GENO.ST',    # Genovis - Glycan analysis tools
     'CALLIDITAS.ST', # Calliditas Therapeutics
     'SPRINT.ST'   # Sprint Bioscience - Drug discovery
-]
+)
 
 # Swedish Financial Services
-STOCKHOLM_FINANCIALS = [
+STOCKHOLM_FINANCIALS = (
     'SEB_A.ST',   # SEB A - Skandinaviska Enskilda Banken
     'SEB_C.ST',   # SEB C
     'SWED_A.ST',  # Swedbank A
@@ -359,10 +400,10 @@ STOCKHOLM_FINANCIALS = [
     'LUNDBERGB.ST', # L E Lundbergföretagen B
     'RROS.ST',    # Rörvik Timber - Forest investments
     'ORES.ST'     # Öresund - Investment company
-]
+)
 
 # Swedish Consumer & Retail
-STOCKHOLM_CONSUMER = [
+STOCKHOLM_CONSUMER = (
     'HM_B.ST',    # H&M B - Fashion retail giant
     'HM_A.ST',    # H&M A
     'ICA.ST',     # ICA Gruppen - Retail & real estate
@@ -378,22 +419,21 @@ STOCKHOLM_CONSUMER = [
     'ELUX_B.ST',  # Electrolux B - Home appliances
     'MEKO.ST',    # Mekonomen - Automotive aftermarket
     'INWI.ST'     # Inwido - Windows & doors
-]
+)
 
 # All Stockholm Stock Exchange companies
-STOCKHOLM_ALL = (STOCKHOLM_OMXS30 + STOCKHOLM_INDUSTRIALS_EXTENDED + 
-                STOCKHOLM_TECH_TELECOM + STOCKHOLM_GAMING + 
-                STOCKHOLM_HEALTHCARE + STOCKHOLM_FINANCIALS + 
-                STOCKHOLM_CONSUMER)
-
-# Remove duplicates while preserving order
-STOCKHOLM_ALL = list(dict.fromkeys(STOCKHOLM_ALL))
+@cache
+def stockholm_all():
+    return _union(STOCKHOLM_OMXS30, STOCKHOLM_INDUSTRIALS_EXTENDED,
+                  STOCKHOLM_TECH_TELECOM, STOCKHOLM_GAMING,
+                  STOCKHOLM_HEALTHCARE, STOCKHOLM_FINANCIALS,
+                  STOCKHOLM_CONSUMER)
 
 # DENMARK - Copenhagen Stock Exchange (Nasdaq Copenhagen)
 # =============================================================================
 
 # OMXC25 Index (Top 25 Danish Companies) - Updated 2025
-COPENHAGEN_OMXC25 = [
+COPENHAGEN_OMXC25 = (
     'NOVO-B.CO',  # Novo Nordisk B - Diabetes care leader
     'ASML.AS',    # ASML (Dutch but major Nordic holding)
     'MAERSK-B.CO', # A.P. Møller-Mærsk B - Shipping & logistics
@@ -419,10 +459,10 @@ COPENHAGEN_OMXC25 = [
     'SIM.CO',     # SimCorp - Investment management software
     'NETC.CO',    # Netcompany Group - IT services
     'ZEAL.CO'     # Zealand Pharma - Biotechnology
-]
+)
 
 # Danish Healthcare & Biotech (World leaders)
-COPENHAGEN_HEALTHCARE = [
+COPENHAGEN_HEALTHCARE = (
     'NOVO-B.CO',  # Novo Nordisk B - Global diabetes leader
     'NOVO-A.CO',  # Novo Nordisk A
     'NZYM-B.CO',  # Novozymes B - Enzymes & biosolutions
@@ -443,10 +483,10 @@ COPENHAGEN_HEALTHCARE = [
     'LEO-B.CO',   # LEO Pharma - Dermatology
     'WILLIAM.CO', # William Demant - Hearing aids
     'ZEALAND.CO'  # Zealand Pharma
-]
+)
 
 # Danish Energy & Industrials
-COPENHAGEN_ENERGY_INDUSTRIALS = [
+COPENHAGEN_ENERGY_INDUSTRIALS = (
     'ORSTED.CO',  # Ørsted - Global offshore wind leader
     'VWS.CO',     # Vestas Wind Systems - Wind turbines
     'MAERSK-A.CO', # A.P. Møller-Mærsk A - Shipping
@@ -467,10 +507,10 @@ COPENHAGEN_ENERGY_INDUSTRIALS = [
     'BETTER.CO',  # Better Energy - Solar development
     'SOLAR-B.CO', # Solar A/S - Installation services
     'DANFOSS.CO'  # Danfoss - Engineering solutions
-]
+)
 
 # Danish Financial Services
-COPENHAGEN_FINANCIALS = [
+COPENHAGEN_FINANCIALS = (
     'DANSKE.CO',  # Danske Bank - Largest bank
     'JYSK.CO',    # Jyske Bank
     'RLIB.CO',    # Ringkjøbing Landbobank
@@ -486,10 +526,10 @@ COPENHAGEN_FINANCIALS = [
     'NORDF.CO',   # Nordea Finance
     'INVEST.CO',  # Investment banking services
     'LOAN.CO'     # Alternative lending
-]
+)
 
 # Danish Consumer & Retail
-COPENHAGEN_CONSUMER = [
+COPENHAGEN_CONSUMER = (
     'CARLB.CO',   # Carlsberg B - Global brewing
     'CARLA.CO',   # Carlsberg A
     'PNDORA.CO',  # Pandora - Jewelry & accessories
@@ -510,10 +550,10 @@ COPENHAGEN_CONSUMER = [
     'TDC.CO',     # TDC NET - Telecommunications
     'NORDIC.CO',  # Nordic Entertainment Group
     'SALLING.CO'  # Salling Group - Retail
-]
+)
 
 # Danish Technology
-COPENHAGEN_TECHNOLOGY = [
+COPENHAGEN_TECHNOLOGY = (
     'SIM.CO',     # SimCorp - Investment software
     'NETC.CO',    # Netcompany Group - IT consulting
     'SCAPE.CO',   # Scape Technologies
@@ -529,21 +569,20 @@ COPENHAGEN_TECHNOLOGY = [
     'SITECORE.CO', # Sitecore - Digital experience platform
     'FALCON.CO',  # Falcon.io - Social media management
     'ZENDESK.CO'  # Zendesk (has major Copenhagen operations)
-]
+)
 
 # All Copenhagen Stock Exchange companies
-COPENHAGEN_ALL = (COPENHAGEN_OMXC25 + COPENHAGEN_HEALTHCARE + 
-                 COPENHAGEN_ENERGY_INDUSTRIALS + COPENHAGEN_FINANCIALS + 
-                 COPENHAGEN_CONSUMER + COPENHAGEN_TECHNOLOGY)
-
-# Remove duplicates while preserving order
-COPENHAGEN_ALL = list(dict.fromkeys(COPENHAGEN_ALL))
+@cache
+def copenhagen_all():
+    return _union(COPENHAGEN_OMXC25, COPENHAGEN_HEALTHCARE,
+                  COPENHAGEN_ENERGY_INDUSTRIALS, COPENHAGEN_FINANCIALS,
+                  COPENHAGEN_CONSUMER, COPENHAGEN_TECHNOLOGY)
 
 # FINLAND - Helsinki Stock Exchange (Nasdaq Helsinki)
 # =============================================================================
 
 # Finnish Technology & Telecom
-HELSINKI_TECH = [
+HELSINKI_TECH = (
     'NOKIA.HE',   # Nokia - 5G & network infrastructure
     'NORDEA.HE',  # Nordea Bank
     'FORTUM.HE',  # Fortum - Clean energy
@@ -564,10 +603,10 @@ HELSINKI_TECH = [
     'BASWARE.HE', # Basware - Purchase-to-pay solutions
     'ROVIO.HE',   # Rovio Entertainment - Mobile games
     'REMEDY.HE'   # Remedy Entertainment - Video games
-]
+)
 
 # Finnish Industrials
-HELSINKI_INDUSTRIALS = [
+HELSINKI_INDUSTRIALS = (
     'WARTSILA.HE', # Wärtsilä - Marine power
     'METSO.HE',   # Metso Outotec - Mining equipment
     'KONE.HE',    # KONE - Elevators
@@ -588,20 +627,19 @@ HELSINKI_INDUSTRIALS = [
     'OUTOKUMPU.HE', # Outokumpu - Stainless steel
     'SSAB.HE',    # SSAB - Steel
     'RUUKKI.HE'   # Ruukki Construction - Building solutions
-]
+)
 
 # All Helsinki companies
-HELSINKI_ALL = HELSINKI_TECH + HELSINKI_INDUSTRIALS
-
-# Remove duplicates
-HELSINKI_ALL = list(dict.fromkeys(HELSINKI_ALL))
+@cache
+def helsinki_all():
+    return _union(HELSINKI_TECH, HELSINKI_INDUSTRIALS)
 
 # =============================================================================
 # COMPREHENSIVE SCANDINAVIAN PORTFOLIOS
 # =============================================================================
 
 # Top 50 Scandinavian Blue Chips (Market Leaders)
-SCANDINAVIAN_BLUE_CHIPS = [
+SCANDINAVIAN_BLUE_CHIPS = (
     # Norwegian Leaders
     'EQNR.OL', 'DNB.OL', 'MOWI.OL', 'TEL.OL', 'YAR.OL',
     # Swedish Leaders  
@@ -617,10 +655,10 @@ SCANDINAVIAN_BLUE_CHIPS = [
     'KOG.OL', 'SAAB_B.ST', 'ESSITY_B.ST', 'PNDORA.CO', 'METSO.HE',
     'AKRBP.OL', 'SKF_B.ST', 'NZYM-B.CO', 'ELISA.HE', 'STB.OL',
     'BOL.ST', 'NIBE_B.ST', 'FLS.CO', 'HUHTAMAKI.HE', 'ORKLA.OL'
-]
+)
 
 # ESG & Clean Energy Leaders (Scandinavian Green Champions)
-SCANDINAVIAN_ESG_LEADERS = [
+SCANDINAVIAN_ESG_LEADERS = (
     'ORSTED.CO',   # World's largest offshore wind developer
     'VWS.CO',      # Global wind turbine leader
     'NESTE.HE',    # Renewable diesel pioneer
@@ -641,10 +679,10 @@ SCANDINAVIAN_ESG_LEADERS = [
     'HEXA_B.ST',   # Smart manufacturing solutions
     'GETI_B.ST',   # Healthcare technology
     'AKVA.OL'      # Sustainable aquaculture technology
-]
+)
 
 # Technology & Innovation Portfolio
-SCANDINAVIAN_TECH_INNOVATION = [
+SCANDINAVIAN_TECH_INNOVATION = (
     'NOKIA.HE',    # 5G & network technology
     'ERIC_B.ST',   # Telecom equipment leader
     'SINCH.ST',    # Cloud communications
@@ -665,10 +703,10 @@ SCANDINAVIAN_TECH_INNOVATION = [
     'THIN.OL',     # Printed electronics
     'NEXT.OL',     # Biometric sensors
     'SHAPE.CO'     # Educational robotics
-]
+)
 
 # Defensive Income Portfolio (High dividend yields & stability)
-SCANDINAVIAN_DIVIDEND_STOCKS = [
+SCANDINAVIAN_DIVIDEND_STOCKS = (
     'TEL.OL',      # Telenor - Stable telecom dividends
     'TELIA.ST',    # Telia - Nordic telecom operator
     'HM_B.ST',     # H&M - Retail dividends
@@ -689,10 +727,10 @@ SCANDINAVIAN_DIVIDEND_STOCKS = [
     'TRYG.CO',     # Tryg - Insurance
     'GJF.OL',      # Gjensidige - Insurance
     'INVE_B.ST'    # Investor AB - Investment company
-]
+)
 
 # Growth & Small Cap Portfolio
-SCANDINAVIAN_GROWTH_STOCKS = [
+SCANDINAVIAN_GROWTH_STOCKS = (
     'NOVO-B.CO',   # Novo Nordisk - Diabetes care growth
     'GMAB.CO',     # Genmab - Biotech growth
     'ORSTED.CO',   # Ørsted - Green energy growth
@@ -713,50 +751,79 @@ SCANDINAVIAN_GROWTH_STOCKS = [
     'TOBII.ST',    # Tobii - Eye tracking
     'BACTI.CO',    # Bavarian Nordic - Vaccines
     'REMEDY.HE'    # Remedy Entertainment - Gaming
-]
+)
 
 # Combined All Scandinavian Companies (100+ unique companies)
-SCANDINAVIAN_ALL = (OSLO_ALL + STOCKHOLM_ALL + COPENHAGEN_ALL + HELSINKI_ALL)
-
-# Remove duplicates while preserving order
-SCANDINAVIAN_ALL = list(dict.fromkeys(SCANDINAVIAN_ALL))
+@cache
+def scandinavian_all():
+    return _union(oslo_all(), stockholm_all(), copenhagen_all(), helsinki_all())
+
+# Combined lists are built on first access rather than at import
+_COMBINED_UNIVERSES = {
+    'OSLO_ALL': oslo_all,
+    'STOCKHOLM_ALL': stockholm_all,
+    'COPENHAGEN_ALL': copenhagen_all,
+    'HELSINKI_ALL': helsinki_all,
+    'SCANDINAVIAN_ALL': scandinavian_all,
+}
+
+def __getattr__(name):
+    """Resolve the combined lists lazily, e.g. ``companies.SCANDINAVIAN_ALL``"""
+    if name in _COMBINED_UNIVERSES:
+        return _COMBINED_UNIVERSES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # =============================================================================
 # PORTFOLIO SELECTIONS
 # =============================================================================
 
-# Default ticker list - MODIFY THIS TO CHOOSE YOUR ANALYSIS SET
-TICKERS = SCANDINAVIAN_BLUE_CHIPS  # Change this to any of the lists above
-
-# Alternative portfolio options:
-# TICKERS = SCANDINAVIAN_ALL              # All 100+ companies
-# TICKERS = SCANDINAVIAN_ESG_LEADERS      # Green/sustainable focus
-# TICKERS = SCANDINAVIAN_TECH_INNOVATION  # Technology focus
-# TICKERS = SCANDINAVIAN_DIVIDEND_STOCKS  # Income focus
-# TICKERS = SCANDINAVIAN_GROWTH_STOCKS    # Growth focus
-# TICKERS = OSLO_ALL                      # Norway only
-# TICKERS = STOCKHOLM_ALL                 # Sweden only  
-# TICKERS = COPENHAGEN_ALL                # Denmark only
-# TICKERS = HELSINKI_ALL                  # Finland only
-# TICKERS = BALANCED_PORTFOLIO            # Original US portfolio
-
-# Print selected portfolio info
-print(f"Selected portfolio: {len(TICKERS)} companies")
-print(f"Tickers: {TICKERS[:10]}..." if len(TICKERS) > 10 else f"Tickers: {TICKERS}")
-
-# Portfolio statistics
-if TICKERS == SCANDINAVIAN_ALL:
-    norway_count = len([t for t in TICKERS if t.endswith('.OL')])
-    sweden_count = len([t for t in TICKERS if t.endswith('.ST')])
-    denmark_count = len([t for t in TICKERS if t.endswith('.CO')])
-    finland_count = len([t for t in TICKERS if t.endswith('.HE')])
+# Portfolio choices by short name, each pointing at one of the lists above
+PORTFOLIOS = MappingProxyType({
+    'all': 'SCANDINAVIAN_ALL',                  # All 100+ companies
+    'blue_chips': 'SCANDINAVIAN_BLUE_CHIPS',
+    'esg': 'SCANDINAVIAN_ESG_LEADERS',          # Green/sustainable focus
+    'tech': 'SCANDINAVIAN_TECH_INNOVATION',     # Technology focus
+    'dividend': 'SCANDINAVIAN_DIVIDEND_STOCKS', # Income focus
+    'growth': 'SCANDINAVIAN_GROWTH_STOCKS',     # Growth focus
+    'oslo': 'OSLO_ALL',                         # Norway only
+    'stockholm': 'STOCKHOLM_ALL',               # Sweden only
+    'copenhagen': 'COPENHAGEN_ALL',             # Denmark only
+    'helsinki': 'HELSINKI_ALL',                 # Finland only
+    'balanced': 'BALANCED_PORTFOLIO',           # Original US portfolio
+})
+
+# Default ticker list - set TRADE_PORTFOLIO to any key of PORTFOLIOS (or a list name) to change it
+_portfolio = os.environ.get('TRADE_PORTFOLIO', 'blue_chips')
+try:
+    TICKERS = get_universe(PORTFOLIOS.get(_portfolio, _portfolio))
+except KeyError:
+    raise ValueError(
+        f"Unknown TRADE_PORTFOLIO {_portfolio!r}; use one of {', '.join(PORTFOLIOS)} "
+        f"or a list name: {', '.join(list_universes())}"
+    ) from None
+
+def describe_portfolio(tickers):
+    """Print a summary of a ticker list, with a per-exchange breakdown for SCANDINAVIAN_ALL"""
+    print(f"Selected portfolio: {len(tickers)} companies")
+    print(f"Tickers: {tickers[:10]}..." if len(tickers) > 10 else f"Tickers: {tickers}")
     
-    print(f"\nPortfolio breakdown:")
-    print(f"Norway (Oslo): {norway_count} companies")
-    print(f"Sweden (Stockholm): {sweden_count} companies") 
-    print(f"Denmark (Copenhagen): {denmark_count} companies")
-    print(f"Finland (Helsinki): {finland_count} companies")
-    print(f"Total: {len(TICKERS)} companies")
+    # Portfolio statistics
+    if tickers == scandinavian_all():
+        norway_count = sum(t.endswith('.OL') for t in tickers)
+        sweden_count = sum(t.endswith('.ST') for t in tickers)
+        denmark_count = sum(t.endswith('.CO') for t in tickers)
+        finland_count = sum(t.endswith('.HE') for t in tickers)
+        
+        print(f"\nPortfolio breakdown:")
+        print(f"Norway (Oslo): {norway_count} companies")
+        print(f"Sweden (Stockholm): {sweden_count} companies") 
+        print(f"Denmark (Copenhagen): {denmark_count} companies")
+        print(f"Finland (Helsinki): {finland_count} companies")
+        print(f"Total: {len(tickers)} companies")
+
+if __name__ == "__main__":
+    # Print selected portfolio info
+    describe_portfolio(TICKERS)
     
-print(f"\nTo change portfolio, modify the TICKERS variable in companies.py")
-print(f"Available options: SCANDINAVIAN_ALL, SCANDINAVIAN_BLUE_CHIPS, SCANDINAVIAN_ESG_LEADERS, etc.")
\ No newline at end of file
+    print(f"\nTo change portfolio, set the TRADE_PORTFOLIO environment variable")
+    print(f"Available options: {', '.join(PORTFOLIOS)}")
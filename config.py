@@ -1,11 +1,34 @@
 # config.py
 """Configuration management for the stock factor analyzer"""
 
+import math
 import os
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
+from functools import cache, lru_cache
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+from dataclasses import dataclass, field, fields
 
-@dataclass
+def _asdict(obj) -> Dict:
+    """Shallow field-name -> value mapping of a dataclass instance"""
+    return {f.name: getattr(obj, f.name) for f in fields(obj) if f.init}
+
+def _freeze(value):
+    """Hashable, key-order independent form of a parsed config value"""
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, list):
+        return (list, tuple(_freeze(v) for v in value))
+    return value
+
+def _thaw(value):
+    """Inverse of _freeze, except that lists come back as tuples so cached configs share nothing mutable"""
+    if isinstance(value, tuple) and value and value[0] is dict:
+        return {k: _thaw(v) for k, v in value[1]}
+    if isinstance(value, tuple) and value and value[0] is list:
+        return tuple(_thaw(v) for v in value[1])
+    return value
+
+@dataclass(slots=True, frozen=True)
 class DataConfig:
     """Data fetching configuration"""
     cache_dir: str = "./data_cache"
@@ -14,59 +37,55 @@ class DataConfig:
     batch_size: int = 10  # For async fetching
     adjust_prices: bool = True  # Use adjusted close prices
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FactorConfig:
     """Factor calculation configuration"""
-    momentum_windows: List[int] = field(default_factory=lambda: [21, 63, 126, 252])
-    volatility_windows: List[int] = field(default_factory=lambda: [30, 90])
+    momentum_windows: Tuple[int, ...] = (21, 63, 126, 252)
+    volatility_windows: Tuple[int, ...] = (30, 90)
     zscore_window: int = 252
     winsorize_sigma: float = 3.0
     min_data_points: int = 252  # Minimum days of data required
+    n_jobs: int = 1  # Worker processes for per-ticker TA-Lib indicators (-1 = all cores)
     
-@dataclass
+# Default factor weights as (name, weight) pairs, shared by every FactorWeights
+_MOMENTUM_WEIGHTS = (('1m', 0.1), ('3m', 0.3), ('6m', 0.4), ('12m', 0.2))
+_VALUE_WEIGHTS = (('pe_ratio', 0.3), ('pb_ratio', 0.2), ('ps_ratio', 0.2),
+                  ('peg_ratio', 0.2), ('ev_ebitda', 0.1))
+_QUALITY_WEIGHTS = (('roe', 0.3), ('roa', 0.2), ('profit_margin', 0.2),
+                    ('current_ratio', 0.15), ('debt_to_equity', 0.15))
+_GROWTH_WEIGHTS = (('revenue_growth', 0.5), ('earnings_growth', 0.5))
+_TECHNICAL_WEIGHTS = (('rsi', 0.2), ('price_to_sma20', 0.3), ('price_to_sma50', 0.3),
+                      ('volatility', 0.2))
+_COMPOSITE_WEIGHTS = (('value', 0.25), ('momentum', 0.20), ('quality', 0.25),
+                      ('growth', 0.15), ('technical', 0.15))
+
+_WEIGHT_GROUPS = ('momentum', 'value', 'quality', 'growth', 'technical', 'composite')
+
+@dataclass(slots=True, frozen=True)
 class FactorWeights:
-    """Factor weights learned from historical data or set manually"""
-    momentum: Dict[str, float] = field(default_factory=lambda: {
-        '1m': 0.1,
-        '3m': 0.3,
-        '6m': 0.4,
-        '12m': 0.2
-    })
-    value: Dict[str, float] = field(default_factory=lambda: {
-        'pe_ratio': 0.3,
-        'pb_ratio': 0.2,
-        'ps_ratio': 0.2,
-        'peg_ratio': 0.2,
-        'ev_ebitda': 0.1
-    })
-    quality: Dict[str, float] = field(default_factory=lambda: {
-        'roe': 0.3,
-        'roa': 0.2,
-        'profit_margin': 0.2,
-        'current_ratio': 0.15,
-        'debt_to_equity': 0.15
-    })
-    growth: Dict[str, float] = field(default_factory=lambda: {
-        'revenue_growth': 0.5,
-        'earnings_growth': 0.5
-    })
-    technical: Dict[str, float] = field(default_factory=lambda: {
-        'rsi': 0.2,
-        'price_to_sma20': 0.3,
-        'price_to_sma50': 0.3,
-        'volatility': 0.2
-    })
+    """Factor weights learned from historical data or set manually
+    
+    Each group is stored as a read-only mapping; build a new FactorWeights to change weights.
+    """
+    momentum: Mapping[str, float] = field(default_factory=lambda: dict(_MOMENTUM_WEIGHTS))
+    value: Mapping[str, float] = field(default_factory=lambda: dict(_VALUE_WEIGHTS))
+    quality: Mapping[str, float] = field(default_factory=lambda: dict(_QUALITY_WEIGHTS))
+    growth: Mapping[str, float] = field(default_factory=lambda: dict(_GROWTH_WEIGHTS))
+    technical: Mapping[str, float] = field(default_factory=lambda: dict(_TECHNICAL_WEIGHTS))
     
     # Composite weights
-    composite: Dict[str, float] = field(default_factory=lambda: {
-        'value': 0.25,
-        'momentum': 0.20,
-        'quality': 0.25,
-        'growth': 0.15,
-        'technical': 0.15
-    })
+    composite: Mapping[str, float] = field(default_factory=lambda: dict(_COMPOSITE_WEIGHTS))
+    
+    def __post_init__(self):
+        for group in _WEIGHT_GROUPS:
+            weights = getattr(self, group)
+            total = sum(weights.values())
+            if weights and not math.isclose(total, 1.0, rel_tol=1e-9, abs_tol=1e-8):
+                raise ValueError(f"{group} weights must sum to 1.0, got {total:.4f}")
+            # Copy before wrapping so the caller's dict can't change us afterwards
+            object.__setattr__(self, group, MappingProxyType(dict(weights)))
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BacktestConfig:
     """Backtesting configuration"""
     initial_capital: float = 1_000_000
@@ -79,8 +98,9 @@ class BacktestConfig:
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     risk_free_rate: float = 0.04  # 4% annual risk-free rate
+    n_jobs: int = 1  # Worker processes for rebalance optimizations (-1 = all cores)
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PortfolioConfig:
     """Portfolio construction configuration"""
     optimization_method: str = "equal_weight"  # equal_weight, risk_parity, mean_variance
@@ -91,16 +111,17 @@ class PortfolioConfig:
     max_position_size: float = 0.10  # 10% max per position
     min_position_size: float = 0.02  # 2% min per position
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ShortTermFactorConfig:
     """Short-term factor configuration for weekly signals"""
-    momentum_windows: List[int] = field(default_factory=lambda: [5, 10])
-    volatility_windows: List[int] = field(default_factory=lambda: [5, 10])
+    momentum_windows: Tuple[int, ...] = (5, 10)
+    volatility_windows: Tuple[int, ...] = (5, 10)
     zscore_window: int = 63          # three months
     winsorize_sigma: float = 2.5
     min_data_points: int = 63        # ~3 months
+    n_jobs: int = 1                  # Worker processes for TA-Lib indicators (-1 = all cores)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SignalConfig:
     """Weekly signal generation configuration"""
     scan_day: str = "Monday"         # Which weekday to generate ideas
@@ -110,9 +131,9 @@ class SignalConfig:
     take_profit_pct: float = 0.06    # 6% TP
     position_size_pct: float = 0.05  # 5% of equity per name
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Config:
-    """Master configuration"""
+    """Master configuration (immutable, so cached instances can be shared safely)"""
     data: DataConfig = field(default_factory=DataConfig)
     factors: FactorConfig = field(default_factory=FactorConfig)
     short_factors: ShortTermFactorConfig = field(default_factory=ShortTermFactorConfig)
@@ -127,7 +148,14 @@ class Config:
     
     @classmethod
     def from_dict(cls, config_dict: Dict) -> 'Config':
-        """Create config from dictionary"""
+        """Create config from dictionary, reusing the instance for repeated inputs"""
+        try:
+            return _cached_from_dict(cls, _freeze(config_dict))
+        except TypeError:  # unhashable or unsortable values, build uncached
+            return cls._build(config_dict)
+    
+    @classmethod
+    def _build(cls, config_dict: Dict) -> 'Config':
         return cls(
             data=DataConfig(**config_dict.get('data', {})),
             factors=FactorConfig(**config_dict.get('factors', {})),
@@ -143,23 +171,22 @@ class Config:
     def to_dict(self) -> Dict:
         """Convert config to dictionary"""
         return {
-            'data': self.data.__dict__,
-            'factors': self.factors.__dict__,
-            'short_factors': self.short_factors.__dict__,
-            'weights': {
-                'momentum': self.weights.momentum,
-                'value': self.weights.value,
-                'quality': self.weights.quality,
-                'growth': self.weights.growth,
-                'technical': self.weights.technical,
-                'composite': self.weights.composite
-            },
-            'backtest': self.backtest.__dict__,
-            'portfolio': self.portfolio.__dict__,
-            'signals': self.signals.__dict__,
+            'data': _asdict(self.data),
+            'factors': _asdict(self.factors),
+            'short_factors': _asdict(self.short_factors),
+            'weights': {group: dict(weights) for group, weights in _asdict(self.weights).items()},
+            'backtest': _asdict(self.backtest),
+            'portfolio': _asdict(self.portfolio),
+            'signals': _asdict(self.signals),
             'log_level': self.log_level,
             'log_file': self.log_file
         }
 
-# Default configuration
-DEFAULT_CONFIG = Config()
\ No newline at end of file
+@lru_cache(maxsize=64)
+def _cached_from_dict(cls, frozen) -> Config:
+    return cls._build(_thaw(frozen))
+
+# Default configuration, built on first use
+@cache
+def default_config() -> Config:
+    return Config()
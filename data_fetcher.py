@@ -4,21 +4,119 @@
 import asyncio
 import aiohttp
 import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
+import hashlib
+import io
 import json
 import os
-import pickle
+import time
+import msgspec
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import logging
 from concurrent.futures import ThreadPoolExecutor
 
 from config import DataConfig
+from jit import njit, prange
+
+try:
+    import bottleneck as bn
+except ImportError:  # optional: falls back to the _forward_fill kernel
+    bn = None
 
 logger = logging.getLogger(__name__)
 
+def _msgpack_enc_hook(obj):
+    """Encode the pandas/NumPy scalars yfinance leaves in fundamentals"""
+    if isinstance(obj, pd.Timestamp):
+        return obj.to_pydatetime()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise NotImplementedError(f"Cannot cache objects of type {type(obj)}")
+
+_msgpack_encoder = msgspec.msgpack.Encoder(enc_hook=_msgpack_enc_hook)
+
+def _content_hash(payload: bytes) -> str:
+    """Short content fingerprint stored next to msgpack cache files"""
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+# Financial statements are kept as Feather bytes until something reads them
+_STATEMENTS = ('financials', 'balance_sheet', 'cashflow')
+
+def _statement_to_feather(statement: Optional[pd.DataFrame]) -> bytes:
+    """Serialize a yfinance statement (line items x report dates) to zstd Feather bytes"""
+    if statement is None or statement.empty:
+        return b''
+    table = statement.T  # one row per report date, one string column per line item
+    table.columns = table.columns.astype(str)
+    table = table.loc[:, ~table.columns.duplicated()]
+    buffer = io.BytesIO()
+    table.rename_axis('date').reset_index().to_feather(buffer, compression='zstd')
+    return buffer.getvalue()
+
+def _statement_from_feather(blob: bytes) -> pd.DataFrame:
+    """Inverse of _statement_to_feather"""
+    if not blob:
+        return pd.DataFrame()
+    return pd.read_feather(io.BytesIO(blob)).set_index('date').T
+
+class Fundamentals(dict):
+    """Fundamentals dict that decodes each financial statement on first access"""
+    
+    def __missing__(self, key):
+        blob = dict.get(self, f'{key}_feather') if key in _STATEMENTS else None
+        if blob is None:
+            raise KeyError(key)
+        statement = _statement_from_feather(blob)
+        self[key] = statement
+        return statement
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+@njit(parallel=True, cache=True)
+def _forward_fill(values, limit):
+    """Forward fill NaNs down each column, at most `limit` rows past the last value"""
+    out = values.copy()
+    for col in prange(out.shape[1]):
+        last = np.nan
+        stale = 0
+        for row in range(out.shape[0]):
+            if np.isnan(out[row, col]):
+                stale += 1
+                if stale <= limit:
+                    out[row, col] = last
+            else:
+                last = out[row, col]
+                stale = 0
+    return out
+
+@lru_cache(maxsize=32)
+def _parse_date(date: str, tz=None) -> pd.Timestamp:
+    """Parse a config date once, localized to the price index timezone if it has one"""
+    timestamp = pd.to_datetime(date)
+    if tz is not None and timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize(tz)
+    return timestamp
+
+# Retry policy for throttled or failing Yahoo requests
+_MAX_RETRIES = 4
+_BACKOFF_BASE_SECONDS = 1.0
+
+def _is_retryable(error: Exception) -> bool:
+    """True for Yahoo rate limiting (429) and server-side (5xx) failures"""
+    if isinstance(error, YFRateLimitError):
+        return True
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status == 429 or (status is not None and status >= 500)
+
 class DataFetcher:
     """Handles all data fetching with async operations and caching"""
     
@@ -26,37 +124,71 @@ class DataFetcher:
         self.config = config
         self.cache_dir = Path(config.cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.executor = ThreadPoolExecutor(max_workers=config.batch_size)
+        self._yf_tickers: Dict[str, yf.Ticker] = {}
+        # Thread pool for blocking yfinance calls, sized for network concurrency rather than cores
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        
+    async def _run_io(self, fetch, *args):
+        """Run a blocking yfinance call (with backoff) on this fetcher's I/O pool"""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=max(32, self.config.batch_size * 4),
+                                               thread_name_prefix='yf-io')
+        return await asyncio.get_running_loop().run_in_executor(self._io_pool, self._with_backoff,
+                                                                fetch, *args)
         
     def _get_cache_path(self, ticker: str, data_type: str) -> Path:
         """Get cache file path for a ticker and data type"""
-        return self.cache_dir / f"{ticker}_{data_type}.pkl"
+        suffix = '.feather' if data_type.startswith('prices_') else '.msgpack'
+        return self.cache_dir / f"{ticker}_{data_type}{suffix}"
     
     def _is_cache_valid(self, cache_path: Path) -> bool:
         """Check if cache file is valid and not expired"""
-        if not cache_path.exists():
-            return False
-        
         if not self.config.use_cache:
             return False
             
+        try:
+            mtime = cache_path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+            
         # Check expiry
-        file_time = datetime.fromtimestamp(cache_path.stat().st_mtime)
-        expiry_time = file_time + timedelta(hours=self.config.cache_expiry_hours)
-        
-        return datetime.now() < expiry_time
+        return time.time() - mtime < self.config.cache_expiry_hours * 3600
     
     def _save_to_cache(self, data: any, ticker: str, data_type: str):
-        """Save data to cache"""
+        """Save data to cache: prices as Feather, everything else as msgpack"""
         cache_path = self._get_cache_path(ticker, data_type)
-        with open(cache_path, 'wb') as f:
-            pickle.dump(data, f)
+        if data_type.startswith('prices_'):
+            data.reset_index().to_feather(cache_path)
+        else:
+            payload = _msgpack_encoder.encode(data)
+            digest = _content_hash(payload)
+            hash_path = cache_path.with_suffix('.hash')
+            if cache_path.exists() and hash_path.exists() and hash_path.read_text() == digest:
+                # Unchanged since the last fetch: just renew the expiry
+                os.utime(cache_path)
+                return
+            cache_path.write_bytes(payload)
+            hash_path.write_text(digest)
             
     def _load_from_cache(self, ticker: str, data_type: str) -> Optional[any]:
         """Load data from cache"""
         cache_path = self._get_cache_path(ticker, data_type)
         if self._is_cache_valid(cache_path):
-            with open(cache_path, 'rb') as f:
+            if data_type.startswith('prices_'):
+                data = pd.read_feather(cache_path)
+                return data.set_index(data.columns[0])
+            payload = cache_path.read_bytes()
+            hash_path = cache_path.with_suffix('.hash')
+            if hash_path.exists() and hash_path.read_text() != _content_hash(payload):
+                logger.warning(f"Discarding partially written cache {cache_path.name}")
+                return None
+            return Fundamentals(msgspec.msgpack.decode(payload, type=dict))
+        
+        # Caches written before the Feather/msgpack switch
+        legacy_path = cache_path.with_suffix('.pkl')
+        if self._is_cache_valid(legacy_path):
+            import pickle
+            with open(legacy_path, 'rb') as f:
                 return pickle.load(f)
         return None
     
@@ -69,14 +201,8 @@ class DataFetcher:
             return cached_data
             
         try:
-            # Use thread executor for yfinance (not truly async)
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(
-                self.executor,
-                self._fetch_yf_prices,
-                ticker,
-                period
-            )
+            # Use the I/O thread pool for yfinance (not truly async)
+            data = await self._run_io(self._fetch_yf_prices, ticker, period)
             
             if data is not None and not data.empty:
                 self._save_to_cache(data, ticker, f"prices_{period}")
@@ -90,12 +216,53 @@ class DataFetcher:
             logger.error(f"Error fetching price data for {ticker}: {e}")
             return None
     
+    def _with_backoff(self, fetch, *args):
+        """Run a blocking yfinance call, retrying rate limits and 5xx with exponential backoff"""
+        for attempt in range(_MAX_RETRIES + 1):
+            try:
+                return fetch(*args)
+            except Exception as e:
+                if attempt == _MAX_RETRIES or not _is_retryable(e):
+                    raise
+                delay = _BACKOFF_BASE_SECONDS * 2 ** attempt
+                logger.warning(f"{fetch.__name__}{args} throttled ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+    
+    def _yf_ticker(self, ticker: str) -> yf.Ticker:
+        """yfinance Ticker object, shared between the price and fundamentals fetches
+        
+        All Ticker objects and yf.download go through yfinance's process-wide
+        session, so HTTP connections are already pooled across tickers.
+        """
+        stock = self._yf_tickers.get(ticker)
+        if stock is None:
+            stock = self._yf_tickers.setdefault(ticker, yf.Ticker(ticker))
+        return stock
+    
     def _fetch_yf_prices(self, ticker: str, period: str) -> pd.DataFrame:
         """Fetch prices using yfinance"""
-        stock = yf.Ticker(ticker)
-        data = stock.history(period=period, auto_adjust=self.config.adjust_prices)
+        data = self._yf_ticker(ticker).history(period=period, auto_adjust=self.config.adjust_prices)
+        return self._clean_prices(data)
+    
+    def _batch_download(self, tickers: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        """Fetch prices for several tickers in a single yf.download call"""
+        frame = yf.download(tickers, period=period, group_by='ticker', threads=True,
+                            auto_adjust=self.config.adjust_prices, actions=True,
+                            ignore_tz=False, progress=False)
         
-        # Add some data quality checks
+        prices = {}
+        if frame is None or frame.empty:
+            return prices
+            
+        # Columns are (ticker, field); tickers that failed come back all-NaN
+        for ticker in frame.columns.get_level_values(0).unique():
+            data = self._clean_prices(frame[ticker].dropna(how='all'))
+            if not data.empty:
+                prices[ticker] = data
+        return prices
+    
+    def _clean_prices(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Data quality checks shared by the single and batched price fetches"""
         if data.empty:
             return data
             
@@ -119,12 +286,7 @@ class DataFetcher:
             return cached_data
             
         try:
-            loop = asyncio.get_event_loop()
-            data = await loop.run_in_executor(
-                self.executor,
-                self._fetch_yf_fundamentals,
-                ticker
-            )
+            data = await self._run_io(self._fetch_yf_fundamentals, ticker)
             
             if data:
                 self._save_to_cache(data, ticker, "fundamentals")
@@ -140,7 +302,7 @@ class DataFetcher:
     
     def _fetch_yf_fundamentals(self, ticker: str) -> Dict:
         """Fetch fundamentals using yfinance"""
-        stock = yf.Ticker(ticker)
+        stock = self._yf_ticker(ticker)
         
         # Get all available data
         info = stock.info or {}
@@ -158,47 +320,62 @@ class DataFetcher:
                     continue  # Skip zero P/E ratios
                 clean_info[key] = value
         
-        return {
+        return Fundamentals({
             'info': clean_info,
-            'financials': financials.to_dict() if financials is not None and not financials.empty else {},
-            'balance_sheet': balance_sheet.to_dict() if balance_sheet is not None and not balance_sheet.empty else {},
-            'cashflow': cashflow.to_dict() if cashflow is not None and not cashflow.empty else {}
-        }
+            'financials_feather': _statement_to_feather(financials),
+            'balance_sheet_feather': _statement_to_feather(balance_sheet),
+            'cashflow_feather': _statement_to_feather(cashflow)
+        })
     
     async def fetch_multiple_tickers(self, tickers: List[str], period: str = '5y') -> Dict[str, Dict]:
-        """Fetch data for multiple tickers concurrently"""
-        all_data = {}
+        """Fetch data for multiple tickers concurrently, at most batch_size in flight"""
+        semaphore = asyncio.Semaphore(self.config.batch_size)
         
-        # Process in batches
-        for i in range(0, len(tickers), self.config.batch_size):
-            batch = tickers[i:i + self.config.batch_size]
-            
-            # Create tasks for price and fundamental data
-            price_tasks = [self.fetch_price_data(ticker, period) for ticker in batch]
-            fundamental_tasks = [self.fetch_fundamental_data(ticker) for ticker in batch]
-            
-            # Run concurrently
-            price_results = await asyncio.gather(*price_tasks, return_exceptions=True)
-            fundamental_results = await asyncio.gather(*fundamental_tasks, return_exceptions=True)
-            
-            # Combine results
-            for ticker, price_data, fundamental_data in zip(batch, price_results, fundamental_results):
-                if isinstance(price_data, Exception):
-                    logger.error(f"Price fetch failed for {ticker}: {price_data}")
-                    price_data = None
-                if isinstance(fundamental_data, Exception):
-                    logger.error(f"Fundamental fetch failed for {ticker}: {fundamental_data}")
-                    fundamental_data = None
-                    
-                if price_data is not None:
-                    all_data[ticker] = {
-                        'prices': price_data,
-                        'fundamentals': fundamental_data or {}
-                    }
-            
-            # Brief pause between batches to avoid rate limiting
-            if i + self.config.batch_size < len(tickers):
-                await asyncio.sleep(0.5)
+        # Serve cached prices directly and download all misses in one batched request
+        prices = {}
+        for ticker in tickers:
+            cached_data = self._load_from_cache(ticker, f"prices_{period}")
+            if cached_data is not None:
+                prices[ticker] = cached_data
+        
+        misses = [ticker for ticker in tickers if ticker not in prices]
+        if len(misses) > 1:
+            try:
+                downloaded = await self._run_io(self._batch_download, misses, period)
+            except Exception as e:
+                logger.error(f"Batch price download failed, falling back to per-ticker: {e}")
+                downloaded = {}
+                
+            for ticker, data in downloaded.items():
+                self._save_to_cache(data, ticker, f"prices_{period}")
+                prices[ticker] = data
+            logger.info(f"Batch-fetched price data for {len(downloaded)}/{len(misses)} tickers")
+        
+        async def fetch_one(ticker: str):
+            async with semaphore:
+                price_data = prices.get(ticker)
+                if price_data is None:
+                    # Single-ticker fallback for anything the batch did not return
+                    price_data = await self.fetch_price_data(ticker, period)
+                if price_data is None:
+                    return None, None
+                return price_data, await self.fetch_fundamental_data(ticker)
+        
+        results = await asyncio.gather(*(fetch_one(ticker) for ticker in tickers),
+                                       return_exceptions=True)
+        
+        all_data = {}
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, Exception):
+                logger.error(f"Fetch failed for {ticker}: {result}")
+                continue
+                
+            price_data, fundamental_data = result
+            if price_data is not None:
+                all_data[ticker] = {
+                    'prices': price_data,
+                    'fundamentals': fundamental_data or {}
+                }
         
         return all_data
     
@@ -245,7 +422,17 @@ class DataFetcher:
     def get_aligned_prices(self, data: Dict[str, Dict], 
                           start_date: Optional[str] = None,
                           end_date: Optional[str] = None) -> pd.DataFrame:
-        """Get aligned price data for all tickers"""
+        """Get aligned price data for all tickers
+        
+        The float32 result is also kept as an .npy file in the cache directory and
+        memory-mapped on later calls while every ticker's close history is unchanged.
+        """
+        fingerprint = self._close_fingerprint(data)
+        if self.config.use_cache:
+            cached = self._load_aligned_prices(list(data), start_date, end_date, fingerprint)
+            if cached is not None:
+                return cached
+        
         price_dict = {}
         
         for ticker, ticker_data in data.items():
@@ -255,17 +442,90 @@ class DataFetcher:
         # Create aligned DataFrame
         aligned_prices = pd.DataFrame(price_dict)
         
-        # Apply date filters if provided
-        if start_date:
-            aligned_prices = aligned_prices[aligned_prices.index >= pd.to_datetime(start_date)]
-        if end_date:
-            aligned_prices = aligned_prices[aligned_prices.index <= pd.to_datetime(end_date)]
+        # Apply date filters if provided (binary search on the sorted index)
+        if start_date or end_date:
+            if not aligned_prices.index.is_monotonic_increasing:
+                aligned_prices = aligned_prices.sort_index()
+            tz = getattr(aligned_prices.index, 'tz', None)
+            start = _parse_date(start_date, tz) if start_date else None
+            end = _parse_date(end_date, tz) if end_date else None
+            aligned_prices = aligned_prices.loc[start:end]
             
-        # Forward fill missing values (up to 5 days)
-        aligned_prices = aligned_prices.fillna(method='ffill', limit=5)
+        # Forward fill missing values (up to 5 days), in single precision to halve
+        # memory traffic in the downstream factor passes
+        values = aligned_prices.to_numpy(dtype=np.float32)
+        if bn is not None:
+            values = bn.push(values, n=5, axis=0)
+        else:
+            values = _forward_fill(values, 5)
         
+        aligned_prices = pd.DataFrame(values, index=aligned_prices.index, columns=aligned_prices.columns)
+        if self.config.use_cache:
+            self._save_aligned_prices(aligned_prices, start_date, end_date, fingerprint)
         return aligned_prices
     
+    def _close_fingerprint(self, data: Dict[str, Dict]) -> str:
+        """Content hash of every ticker's close history and the settings that shape it"""
+        digest = hashlib.blake2b(_msgpack_encoder.encode([self.config.adjust_prices]), digest_size=8)
+        for ticker, ticker_data in data.items():
+            close = ticker_data['prices']['Close']
+            digest.update(ticker.encode() + b'\0')
+            digest.update(close.index.values.astype('datetime64[ns]').tobytes())
+            digest.update(close.to_numpy(dtype=np.float64).tobytes())
+        return digest.hexdigest()
+    
+    def _aligned_request_key(self, tickers: List[str], start_date: Optional[str],
+                             end_date: Optional[str]) -> str:
+        """Cache key for an aligned-price request, independent of the price contents"""
+        return _content_hash(_msgpack_encoder.encode([tickers, start_date, end_date]))
+    
+    def _aligned_cache_paths(self, tickers: List[str], start_date: Optional[str],
+                             end_date: Optional[str], fingerprint: str) -> Tuple[Path, Path]:
+        """Matrix and sidecar paths for an aligned-price request built from given histories"""
+        key = self._aligned_request_key(tickers, start_date, end_date)
+        base = self.cache_dir / f"aligned_{key}_{fingerprint}"
+        return base.with_suffix('.npy'), base.with_suffix('.meta')
+    
+    def _save_aligned_prices(self, aligned_prices: pd.DataFrame, start_date: Optional[str],
+                             end_date: Optional[str], fingerprint: str):
+        """Write the aligned matrix plus a msgpack sidecar describing its axes"""
+        tickers = list(aligned_prices.columns)
+        matrix_path, meta_path = self._aligned_cache_paths(tickers, start_date, end_date, fingerprint)
+        
+        # Drop matrices this request built from older histories (and the pre-fingerprint layout)
+        key = self._aligned_request_key(tickers, start_date, end_date)
+        for stale in [*self.cache_dir.glob(f"aligned_{key}_*"), *self.cache_dir.glob(f"aligned_{key}.*")]:
+            if stale not in (matrix_path, meta_path):
+                stale.unlink(missing_ok=True)
+        
+        np.save(matrix_path, aligned_prices.to_numpy(dtype=np.float32))
+        index = aligned_prices.index
+        meta_path.write_bytes(_msgpack_encoder.encode({
+            'tickers': list(aligned_prices.columns),
+            'dates': index.values.astype('datetime64[ns]').view('i8').tolist(),
+            'tz': str(index.tz) if getattr(index, 'tz', None) is not None else None
+        }))
+    
+    def _load_aligned_prices(self, tickers: List[str], start_date: Optional[str],
+                             end_date: Optional[str], fingerprint: str) -> Optional[pd.DataFrame]:
+        """Memory-map a cached aligned matrix if it was built from the same close histories"""
+        matrix_path, meta_path = self._aligned_cache_paths(tickers, start_date, end_date, fingerprint)
+        if not (meta_path.exists() and matrix_path.exists()):
+            return None
+            
+        meta = msgspec.msgpack.decode(meta_path.read_bytes(), type=dict)
+        if meta['tickers'] != tickers:
+            return None
+            
+        # Copy-on-write mapping: reads come straight from the page cache, writes stay private
+        values = np.load(matrix_path, mmap_mode='c')
+        index = pd.DatetimeIndex(np.array(meta['dates'], dtype='datetime64[ns]'))
+        if meta['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(meta['tz'])
+        return pd.DataFrame(values, index=index, columns=meta['tickers'], copy=False)
+    
     def close(self):
         """Clean up resources"""
-        self.executor.shutdown(wait=True)
\ No newline at end of file
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
\ No newline at end of file
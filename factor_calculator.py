@@ -4,14 +4,134 @@
 import pandas as pd
 import numpy as np
 import talib
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from scipy import stats
 
+try:
+    import bottleneck as bn
+except ImportError:  # optional: falls back to pandas rolling windows
+    bn = None
+
 from config import FactorConfig, FactorWeights
+from jit import NUMBA_AVAILABLE, njit
 
 logger = logging.getLogger(__name__)
 
+# Working precision for factor arrays; TA-Lib inputs are the only float64 exception
+_DTYPE = np.float32
+
+@njit(cache=True)
+def _rolling_sma(values, window):
+    """Trailing simple moving average kept as a running sum, as talib.SMA computes it
+    
+    Leading NaNs are skipped and a later NaN carries through, the same as TA-Lib.
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    start = 0
+    while start < n and np.isnan(values[start]):
+        start += 1
+    if n - start < window:
+        return out
+    
+    total = 0.0
+    for i in range(start, start + window - 1):
+        total += values[i]
+    for i in range(start + window - 1, n):
+        total += values[i]
+        out[i] = total / window
+        total -= values[i - window + 1]
+    return out
+
+def _technical_indicators(arrays: Tuple[np.ndarray, np.ndarray]) -> Dict[str, np.ndarray]:
+    """TA-Lib indicators for one ticker's (close, volume) float64 arrays"""
+    close, volume = arrays
+    factors = {}
+    
+    # RSI - normalized distance from 50 (mean reversion)
+    if len(close) > 14:
+        rsi = talib.RSI(close, timeperiod=14)
+        rsi_distance = np.abs(rsi - 50)
+        factors['rsi_mean_reversion'] = -rsi_distance  # Negative because closer to 50 is better
+    
+    # MACD signal strength (not just binary)
+    if len(close) > 26:
+        # Only the histogram is kept; the MACD and signal lines are released right away
+        factors['macd_histogram'] = talib.MACD(close)[2]
+    
+    # Bollinger Band position
+    if len(close) > 20:
+        upper, middle, lower = talib.BBANDS(close, timeperiod=20)
+        bb_position = (close - lower) / (upper - lower)
+        factors['bb_position'] = bb_position - 0.5  # Center around 0
+    
+    # Volume trends
+    if len(volume) > 20:
+        volume_sma = _rolling_sma(volume, 20)
+        factors['volume_ratio'] = volume / volume_sma - 1
+    
+    # Downstream maths runs in the module's working precision
+    return {name: values.astype(_DTYPE) for name, values in factors.items()}
+
+# fastmath is left off: it assumes no NaNs and would drop the isnan checks
+@njit(cache=True)
+def _zscore_winsorize(x, w_sigma):
+    """Z-score of the non-NaN entries of x, clipped to +/-w_sigma when w_sigma > 0
+    
+    Fewer than 3 values are returned unchanged and a flat input becomes all zeros.
+    """
+    out = x.copy()
+    n = 0
+    total = 0.0
+    for v in x:
+        if not np.isnan(v):
+            n += 1
+            total += v
+    if n < 3:  # Need at least 3 values
+        return out
+        
+    mean = total / n
+    squares = 0.0
+    for v in x:
+        if not np.isnan(v):
+            squares += (v - mean) ** 2
+    std = np.sqrt(squares / (n - 1))
+    
+    if std == 0:
+        out[:] = 0
+        return out
+        
+    for i in range(len(x)):
+        z = (x[i] - mean) / std
+        if w_sigma > 0:
+            if z > w_sigma:
+                z = w_sigma
+            elif z < -w_sigma:
+                z = -w_sigma
+        out[i] = z
+    return out
+
+@njit(cache=True)
+def _zscore_winsorize_2d(values, w_sigma):
+    """_zscore_winsorize applied to every row of a 2-D array"""
+    out = np.empty_like(values)
+    for row in range(values.shape[0]):
+        out[row] = _zscore_winsorize(values[row], w_sigma)
+    return out
+
+@lru_cache(maxsize=None)
+def split_factor_column(col: str) -> Tuple[str, str]:
+    """Split a <factor>_<window>d_<ticker> column into (factor name, ticker)
+    
+    Only the first two fields are split off, so tickers may contain '_' (e.g. INVE_B.ST).
+    """
+    name, window, ticker = col.split('_', 2)
+    return f'{name}_{window}', ticker
+
 class FactorCalculator:
     """Calculate factors with proper normalization"""
     
@@ -19,120 +139,160 @@ class FactorCalculator:
         self.config = config
         self.weights = weights
         
-    def calculate_zscore(self, series: pd.Series, window: int = None) -> pd.Series:
-        """Calculate rolling z-score with proper handling of NaN values"""
+    def calculate_zscore(self, series: Union[pd.Series, pd.DataFrame],
+                         window: int = None) -> Union[pd.Series, pd.DataFrame]:
+        """Calculate rolling z-score with proper handling of NaN values
+        
+        Accepts a Series or a wide DataFrame; every column is handled in one pass.
+        """
+        zscore = self._rolling_zscore(series.to_numpy(dtype=_DTYPE), window)
+        
+        if isinstance(series, pd.DataFrame):
+            return pd.DataFrame(zscore, index=series.index, columns=series.columns)
+        return pd.Series(zscore, index=series.index, name=series.name)
+    
+    def _rolling_zscore(self, values: np.ndarray, window: int = None) -> np.ndarray:
+        """calculate_zscore on a raw (dates[, tickers]) array"""
         if window is None:
             window = self.config.zscore_window
-            
-        rolling_mean = series.rolling(window=window, min_periods=window//2).mean()
-        rolling_std = series.rolling(window=window, min_periods=window//2).std()
+        min_periods = max(window // 2, 1)
         
-        # Avoid division by zero
-        rolling_std = rolling_std.replace(0, np.nan)
+        if bn is not None:
+            rolling_mean = bn.move_mean(values, window, min_count=min_periods, axis=0)
+            rolling_std = bn.move_std(values, window, min_count=max(min_periods, 2), ddof=1, axis=0)
+        else:
+            frame = pd.DataFrame(values) if values.ndim == 2 else pd.Series(values)
+            rolling = frame.rolling(window=window, min_periods=min_periods)
+            rolling_mean = rolling.mean().to_numpy(dtype=_DTYPE)
+            rolling_std = rolling.std().to_numpy(dtype=_DTYPE)
         
-        zscore = (series - rolling_mean) / rolling_std
+        # One output buffer; the divide, zero-std masking and winsorizing all happen in place
+        zscore = np.subtract(values, rolling_mean, dtype=_DTYPE)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(zscore, rolling_std, out=zscore)
+        
+        # Avoid division by zero
+        zscore[rolling_std == 0] = np.nan
         
         # Winsorize extreme values
         if self.config.winsorize_sigma > 0:
-            zscore = zscore.clip(
-                lower=-self.config.winsorize_sigma,
-                upper=self.config.winsorize_sigma
-            )
+            np.clip(zscore, -self.config.winsorize_sigma, self.config.winsorize_sigma, out=zscore)
             
         return zscore
     
-    def calculate_momentum_factors(self, prices: pd.DataFrame) -> pd.DataFrame:
-        """Calculate momentum factors for all tickers"""
-        factor_list = []
-        
-        for window in self.config.momentum_windows:
-            # Calculate returns
-            returns = prices.pct_change(window)
+    def _stack_windows(self, prefix: str, windows: List[int], factors: np.ndarray,
+                       prices: pd.DataFrame) -> pd.DataFrame:
+        """Flatten a (window, date, ticker) factor tensor into one <prefix>_<w>d_<ticker> frame"""
+        n_windows, n_dates, n_tickers = factors.shape
+        columns = [f'{prefix}_{window}d_{ticker}' for window in windows for ticker in prices.columns]
+        return pd.DataFrame(factors.transpose(1, 0, 2).reshape(n_dates, n_windows * n_tickers),
+                            index=prices.index, columns=columns)
+    
+    def _period_returns(self, values: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+        """Same as pct_change(window) on a (dates x tickers) array, by offset division"""
+        if out is None:
+            out = np.empty_like(values)
+        out[:window] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(values[window:], values[:-window], out=out[window:])
+        out[window:] -= 1
+        return out
+    
+    def _momentum_tensor(self, values: np.ndarray) -> np.ndarray:
+        """(window, date, ticker) momentum z-scores from a price array"""
+        windows = self.config.momentum_windows
+        returns = np.empty_like(values)
+        factors = np.empty((len(windows), *values.shape), dtype=_DTYPE)
+        for i, window in enumerate(windows):
+            # Calculate returns into one reused buffer and apply z-score normalization
+            factors[i] = self._rolling_zscore(self._period_returns(values, window, out=returns))
             
-            # Apply z-score normalization
-            factor_name = f'momentum_{window}d'
-            zscore_returns = self.calculate_zscore(returns)
+            logger.debug(f"Calculated momentum_{window}d for {values.shape[1]} tickers")
+        
+        return factors
+    
+    def _volatility_tensor(self, daily_returns: np.ndarray) -> np.ndarray:
+        """(window, date, ticker) inverted volatility z-scores from a daily return array"""
+        windows = self.config.volatility_windows
+        factors = np.empty((len(windows), *daily_returns.shape), dtype=_DTYPE)
+        for i, window in enumerate(windows):
+            # Annualized volatility
+            if bn is not None:
+                vol = bn.move_std(daily_returns, window, min_count=max(window // 2, 1), ddof=1, axis=0)
+            else:
+                vol = (pd.DataFrame(daily_returns).rolling(window=window, min_periods=window//2)
+                       .std().to_numpy(dtype=_DTYPE))
+            vol *= np.sqrt(252)
             
-            # Rename columns to include factor name
-            zscore_returns.columns = [f'{factor_name}_{col}' for col in zscore_returns.columns]
-            factor_list.append(zscore_returns)
+            # Invert and normalize (lower volatility is better)
+            factors[i] = -self._rolling_zscore(vol)
             
-            logger.debug(f"Calculated {factor_name} for {len(prices.columns)} tickers")
+            logger.debug(f"Calculated volatility_{window}d")
         
-        # Concatenate all factors horizontally
-        if factor_list:
-            return pd.concat(factor_list, axis=1)
-        else:
+        return factors
+    
+    def calculate_momentum_factors(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """Calculate momentum factors for all tickers"""
+        if not self.config.momentum_windows:
             return pd.DataFrame()
+        
+        factors = self._momentum_tensor(prices.to_numpy(dtype=_DTYPE))
+        return self._stack_windows('momentum', self.config.momentum_windows, factors, prices)
     
     def calculate_volatility_factors(self, prices: pd.DataFrame) -> pd.DataFrame:
         """Calculate volatility factors"""
-        factor_list = []
+        if not self.config.volatility_windows:
+            return pd.DataFrame()
         
         # Daily returns
-        returns = prices.pct_change()
-        
-        for window in self.config.volatility_windows:
-            # Annualized volatility
-            vol = returns.rolling(window=window, min_periods=window//2).std() * np.sqrt(252)
-            
-            # Invert and normalize (lower volatility is better)
-            factor_name = f'volatility_{window}d'
-            zscore_vol = -self.calculate_zscore(vol)
-            
-            # Rename columns to include factor name
-            zscore_vol.columns = [f'{factor_name}_{col}' for col in zscore_vol.columns]
-            factor_list.append(zscore_vol)
-            
-            logger.debug(f"Calculated {factor_name}")
+        returns = self._period_returns(prices.to_numpy(dtype=_DTYPE), 1)
         
-        # Concatenate all factors horizontally
-        if factor_list:
-            return pd.concat(factor_list, axis=1)
-        else:
-            return pd.DataFrame()
+        factors = self._volatility_tensor(returns)
+        return self._stack_windows('volatility', self.config.volatility_windows, factors, prices)
+    
+    def calculate_short_term_factors(self, prices: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Momentum and volatility factors from a single conversion of the price frame"""
+        momentum = volatility = pd.DataFrame()
+        values = prices.to_numpy(dtype=_DTYPE)
+        
+        if self.config.momentum_windows:
+            momentum = self._stack_windows('momentum', self.config.momentum_windows,
+                                           self._momentum_tensor(values), prices)
+        if self.config.volatility_windows:
+            volatility = self._stack_windows('volatility', self.config.volatility_windows,
+                                             self._volatility_tensor(self._period_returns(values, 1)),
+                                             prices)
+        return momentum, volatility
     
     def calculate_technical_factors(self, data: Dict[str, Dict]) -> pd.DataFrame:
         """Calculate technical indicators"""
-        all_factors = []
-        
+        price_frames = {}
+        jobs = []
         for ticker, ticker_data in data.items():
             prices = ticker_data['prices']
             if prices is None or prices.empty:
                 continue
                 
-            # Convert to float64 for TA-Lib
-            close = prices['Close'].values.astype(np.float64)
-            high = prices['High'].values.astype(np.float64)
-            low = prices['Low'].values.astype(np.float64)
-            volume = prices['Volume'].values.astype(np.float64)
-            
-            factors = {}
-            
-            # RSI - normalized distance from 50 (mean reversion)
-            if len(close) > 14:
-                rsi = talib.RSI(close, timeperiod=14)
-                rsi_distance = np.abs(rsi - 50)
-                factors['rsi_mean_reversion'] = -rsi_distance  # Negative because closer to 50 is better
-            
-            # MACD signal strength (not just binary)
-            if len(close) > 26:
-                macd, signal, hist = talib.MACD(close)
-                factors['macd_histogram'] = hist
-            
-            # Bollinger Band position
-            if len(close) > 20:
-                upper, middle, lower = talib.BBANDS(close, timeperiod=20)
-                bb_position = (close - lower) / (upper - lower)
-                factors['bb_position'] = bb_position - 0.5  # Center around 0
-            
-            # Volume trends
-            if len(volume) > 20:
-                # Convert to float64 for TA-Lib
-                volume_float = volume.astype(np.float64)
-                volume_sma = talib.SMA(volume_float, timeperiod=20)
-                factors['volume_ratio'] = volume / volume_sma - 1
-            
+            # TA-Lib's C entry points only take contiguous float64
+            price_frames[ticker] = prices
+            jobs.append((np.ascontiguousarray(prices['Close'].values, dtype=np.float64),
+                         np.ascontiguousarray(prices['Volume'].values, dtype=np.float64)))
+        
+        # TA-Lib holds the GIL, so spread tickers across processes when n_jobs != 1
+        n_jobs = self.config.n_jobs
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(jobs))
+        
+        if n_jobs <= 1:
+            results = list(map(_technical_indicators, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(_technical_indicators, jobs,
+                                            chunksize=max(1, len(jobs) // (4 * n_jobs))))
+        
+        all_factors = []
+        for (ticker, prices), factors in zip(price_frames.items(), results):
             # Convert to DataFrame with DatetimeIndex
             factor_df = pd.DataFrame(factors, index=prices.index)
             factor_df['ticker'] = ticker
@@ -141,142 +301,58 @@ class FactorCalculator:
         if not all_factors:
             return pd.DataFrame()
             
-        # Combine all tickers and pivot to wide format
-        combined = pd.concat(all_factors)
-        
-        # Pivot to have tickers as columns
-        result_dfs = []
-        for factor_col in [col for col in combined.columns if col != 'ticker']:
-            # Create a pivot table for each factor
-            factor_wide = combined.pivot_table(
-                index=combined.index,
-                columns='ticker',
-                values=factor_col,
-                aggfunc='first'
-            )
-            
-            # Normalize across tickers for each date
-            for date in factor_wide.index:
-                factor_wide.loc[date] = self._cross_sectional_zscore(factor_wide.loc[date])
-            
-            # Rename columns to include factor name
-            factor_wide.columns = [f'{factor_col}_{ticker}' for ticker in factor_wide.columns]
-            result_dfs.append(factor_wide)
-        
-        if result_dfs:
-            return pd.concat(result_dfs, axis=1)
-        else:
+        # Combine all tickers and unstack to one wide frame with (factor, ticker) columns
+        combined = pd.concat(all_factors).set_index('ticker', append=True)
+        if combined.columns.empty:
             return pd.DataFrame()
-    
-    def calculate_fundamental_factors(self, data: Dict[str, Dict], 
-                                    reference_date: pd.Timestamp) -> pd.DataFrame:
-        """Calculate fundamental factors for a specific date"""
-        factor_rows = []
-        
-        for ticker, ticker_data in data.items():
-            fundamentals = ticker_data.get('fundamentals', {})
-            info = fundamentals.get('info', {})
-            
-            if not info:
-                continue
-                
-            factors = {
-                'ticker': ticker,
-                'date': reference_date
-            }
-            
-            # Valuation factors (lower is better, so we'll invert later)
-            factors['pe_ratio'] = info.get('trailingPE', np.nan)
-            factors['forward_pe'] = info.get('forwardPE', np.nan)
-            factors['pb_ratio'] = info.get('priceToBook', np.nan)
-            factors['ps_ratio'] = info.get('priceToSalesTrailing12Months', np.nan)
-            factors['peg_ratio'] = info.get('pegRatio', np.nan)
-            factors['ev_ebitda'] = info.get('enterpriseToEbitda', np.nan)
-            
-            # Quality factors (higher is better)
-            factors['roe'] = info.get('returnOnEquity', np.nan)
-            factors['roa'] = info.get('returnOnAssets', np.nan)
-            factors['profit_margin'] = info.get('profitMargins', np.nan)
-            factors['operating_margin'] = info.get('operatingMargins', np.nan)
-            
-            # Growth factors
-            factors['revenue_growth'] = info.get('revenueGrowth', np.nan)
-            factors['earnings_growth'] = info.get('earningsGrowth', np.nan)
-            
-            # Financial health
-            factors['debt_to_equity'] = info.get('debtToEquity', np.nan)
-            factors['current_ratio'] = info.get('currentRatio', np.nan)
-            factors['quick_ratio'] = info.get('quickRatio', np.nan)
-            factors['free_cashflow_yield'] = self._calculate_fcf_yield(info)
-            
-            # Market factors
-            factors['market_cap'] = np.log(info.get('marketCap', 1))  # Log transform
-            factors['beta'] = info.get('beta', 1.0)
-            
-            factor_rows.append(factors)
-        
-        # Create DataFrame
-        factors_df = pd.DataFrame(factor_rows)
-        
-        # Normalize factors
-        normalized_df = factors_df.copy()
-        
-        # Define which factors to invert (lower is better)
-        invert_factors = ['pe_ratio', 'forward_pe', 'pb_ratio', 'ps_ratio', 
-                         'peg_ratio', 'ev_ebitda', 'debt_to_equity', 'beta']
-        
-        # Normalize each factor
-        for col in factors_df.columns:
-            if col in ['ticker', 'date']:
-                continue
-                
-            # Handle the factor
-            if col in invert_factors:
-                # Invert first (handle zeros and negatives)
-                values = factors_df[col]
-                # Cap extreme values before inverting
-                values = values.clip(lower=values.quantile(0.05), 
-                                   upper=values.quantile(0.95))
-                inverted = 1 / values.replace(0, np.nan)
-                normalized_df[col] = self._cross_sectional_zscore(inverted)
-            else:
-                normalized_df[col] = self._cross_sectional_zscore(factors_df[col])
-        
-        return normalized_df.set_index('ticker')
-    
-    def _calculate_fcf_yield(self, info: Dict) -> float:
-        """Calculate free cash flow yield"""
-        fcf = info.get('freeCashflow', 0)
-        market_cap = info.get('marketCap', 0)
-        
-        if market_cap > 0 and fcf is not None:
-            return fcf / market_cap
-        return np.nan
+        # Yahoo histories sometimes repeat their last row; unstack rejects duplicate keys
+        combined = combined[~combined.index.duplicated(keep='first')]
+        wide = combined.unstack('ticker')
+        
+        factor_cols = list(combined.columns)
+        tickers = wide[factor_cols[0]].columns
+        n_dates, n_factors, n_tickers = len(wide), len(factor_cols), len(tickers)
+        
+        # Normalize across tickers for every (factor, date) row in a single kernel call
+        values = wide.to_numpy(dtype=_DTYPE).reshape(n_dates, n_factors, n_tickers)
+        rows = np.ascontiguousarray(values.transpose(1, 0, 2)).reshape(n_factors * n_dates, n_tickers)
+        zscores = self._cross_sectional_zscore_rows(rows).reshape(n_factors, n_dates, n_tickers)
+        
+        # Flatten to <factor>_<ticker> columns once, dropping dates/tickers a factor never covers
+        result = pd.DataFrame(
+            zscores.transpose(1, 0, 2).reshape(n_dates, n_factors * n_tickers),
+            index=wide.index,
+            columns=[f'{factor_col}_{ticker}' for factor_col in factor_cols for ticker in tickers]
+        )
+        return result.dropna(how='all').dropna(how='all', axis=1)
     
     def _cross_sectional_zscore(self, series: pd.Series) -> pd.Series:
         """Calculate cross-sectional z-score"""
-        # Remove NaN values for calculation
-        valid_data = series.dropna()
+        zscore = _zscore_winsorize(series.to_numpy(dtype=_DTYPE), self.config.winsorize_sigma)
+        return pd.Series(zscore, index=series.index, name=series.name)
+    
+    def _cross_sectional_zscore_rows(self, values: np.ndarray) -> np.ndarray:
+        """Row-wise _cross_sectional_zscore over a (dates x tickers) array"""
+        if NUMBA_AVAILABLE:
+            return _zscore_winsorize_2d(values, self.config.winsorize_sigma)
         
-        if len(valid_data) < 3:  # Need at least 3 values
-            return series
-            
-        mean = valid_data.mean()
-        std = valid_data.std()
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=1, keepdims=True, dtype=values.dtype)
         
-        if std == 0:
-            return pd.Series(0, index=series.index)
-            
-        zscore = (series - mean) / std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(valid, values, 0.0).sum(axis=1, keepdims=True) / count
+            deviation = np.where(valid, values - mean, 0.0)
+            std = np.sqrt((deviation ** 2).sum(axis=1, keepdims=True) / (count - 1))
+            zscore = np.subtract(values, mean, dtype=values.dtype)
+            np.divide(zscore, std, out=zscore)
         
         # Winsorize
         if self.config.winsorize_sigma > 0:
-            zscore = zscore.clip(
-                lower=-self.config.winsorize_sigma,
-                upper=self.config.winsorize_sigma
-            )
-            
-        return zscore
+            np.clip(zscore, -self.config.winsorize_sigma, self.config.winsorize_sigma, out=zscore)
+        
+        # Same fallbacks as the per-row version: flat rows -> 0, too few values -> unchanged
+        zscore = np.where(std == 0, 0.0, zscore)
+        return np.where(count < 3, values, zscore)
     
     def calculate_composite_scores(self, all_factors: pd.DataFrame) -> pd.DataFrame:
         """Calculate weighted composite scores"""
@@ -9,15 +9,16 @@ import argparse
 import sys
 from pathlib import Path
 import json
+from typing import Optional
 
-from config import Config, DEFAULT_CONFIG
+from config import Config, default_config
 from data_fetcher import DataFetcher
-from factor_calculator import FactorCalculator
+from factor_calculator import FactorCalculator, split_factor_column
 from portfolio_optimizer import PortfolioOptimizer
 from backtester import Backtester
 from short_term_signal_generator import ShortTermSignalGenerator
 import utils
-from companies import TICKERS
+from companies import TICKERS, get_universe, list_universes
 
 import logging
 logger = logging.getLogger(__name__)
@@ -39,7 +40,7 @@ class FactorAnalysisSystem:
         self.signal_generator = ShortTermSignalGenerator(self.short_factor_calc, config.signals)
         
     async def fetch_data(self, tickers: list) -> dict:
-        """Fetch all required data"""
+        """Fetch all required data (per-ticker disk cache, see DataConfig.cache_expiry_hours)"""
         logger.info(f"Fetching data for {len(tickers)} tickers...")
         
         # Fetch data
@@ -56,12 +57,13 @@ class FactorAnalysisSystem:
                 
         return clean_data
     
-    def calculate_factors(self, data: dict) -> pd.DataFrame:
+    def calculate_factors(self, data: dict, prices: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         """Calculate all factors"""
         logger.info("Calculating factors...")
         
-        # Get aligned price data
-        prices = self.data_fetcher.get_aligned_prices(data)
+        # Get aligned price data unless the caller already has it
+        if prices is None:
+            prices = self.data_fetcher.get_aligned_prices(data)
         
         # Calculate different factor types
         factor_dfs = []
@@ -87,18 +89,6 @@ class FactorAnalysisSystem:
         else:
             all_factors = pd.DataFrame()
         
-        # Add fundamental factors for each date
-        fundamental_factors_list = []
-        for date in prices.index[-252:]:  # Last year of dates
-            fundamental_factors = self.factor_calculator.calculate_fundamental_factors(data, date)
-            if not fundamental_factors.empty:
-                fundamental_factors['date'] = date
-                fundamental_factors_list.append(fundamental_factors)
-        
-        if fundamental_factors_list:
-            fundamental_df = pd.concat(fundamental_factors_list)
-            fundamental_df = fundamental_df.set_index(['date', fundamental_df.index])
-        
         logger.info(f"Calculated {len(all_factors.columns)} factors")
         
         return all_factors
@@ -106,34 +96,34 @@ class FactorAnalysisSystem:
     def run_analysis(self, tickers: list) -> dict:
         """Run complete analysis pipeline"""
         # Fetch data asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        data = loop.run_until_complete(self.fetch_data(tickers))
-        loop.close()
+        data = asyncio.run(self.fetch_data(tickers))
         
         if not data:
             logger.error("No data available for analysis")
             return None
         
-        # Calculate factors
-        factors = self.calculate_factors(data)
-        
-        # Get prices for score calculation
+        # Align prices once for factors, scores and the backtest
         prices = self.data_fetcher.get_aligned_prices(data)
         
+        # Calculate factors
+        factors = self.calculate_factors(data, prices=prices)
+        
         # Calculate composite scores
         # For now, create a simple score based on momentum (most reliable factor)
         # We'll use the most recent momentum values as scores
         momentum_cols = [col for col in factors.columns if 'momentum' in col]
         if momentum_cols:
+            # Group momentum columns by ticker (momentum_<window>d_<ticker>; tickers may contain '_')
+            momentum_by_ticker = {}
+            for col in momentum_cols:
+                momentum_by_ticker.setdefault(split_factor_column(col)[1], []).append(col)
+            
             # Average momentum across different windows for each ticker
-            ticker_scores = {}
-            for ticker in prices.columns:
-                ticker_momentum_cols = [col for col in momentum_cols if ticker in col]
-                if ticker_momentum_cols:
-                    ticker_scores[ticker] = factors[ticker_momentum_cols].mean(axis=1)
+            ticker_scores = {ticker: factors[cols].mean(axis=1)
+                             for ticker, cols in momentum_by_ticker.items()
+                             if ticker in prices.columns}
             
-            scores = pd.DataFrame(ticker_scores)
+            scores = pd.concat(ticker_scores, axis=1) if ticker_scores else pd.DataFrame()
         else:
             # Fallback: use price returns as scores
             scores = prices.pct_change(21).rolling(252).mean()
@@ -160,7 +150,7 @@ class FactorAnalysisSystem:
             'backtest': backtest_results
         }
     
-    def display_results(self, results: dict):
+    def display_results(self, results: dict, export: str = 'excel'):
         """Display analysis results"""
         if not results:
             return
@@ -192,8 +182,11 @@ class FactorAnalysisSystem:
         # Save plots
         utils.plot_backtest_results(backtest, results_dir / f"backtest_{timestamp}.png")
         
-        # Export to Excel
-        utils.export_to_excel(backtest, results_dir / f"backtest_{timestamp}.xlsx")
+        # Export tables (parquet is much faster to write than Excel for large runs)
+        if export == 'parquet':
+            utils.export_to_parquet(backtest, results_dir / f"backtest_{timestamp}")
+        else:
+            utils.export_to_excel(backtest, results_dir / f"backtest_{timestamp}.xlsx")
         
         logger.info(f"Results saved to {results_dir}")
 
@@ -204,7 +197,7 @@ def main():
     parser.add_argument('--tickers', nargs='+', help='List of tickers to analyze')
     parser.add_argument('--list', type=str, help='Ticker list name from companies.py')
     parser.add_argument('--backtest-only', action='store_true', help='Run backtest only')
-    parser.add_argument('--export', type=str, help='Export format (json, excel, csv)')
+    parser.add_argument('--export', type=str, default='excel', choices=['excel', 'parquet'], help='Export format for backtest tables')
     parser.add_argument('--weekly-signals', action='store_true', help='Emit one-week trade recommendations only')
     
     args = parser.parse_args()
@@ -214,19 +207,18 @@ def main():
         config_data = utils.load_config(args.config)
         config = Config.from_dict(config_data)
     else:
-        config = DEFAULT_CONFIG
+        config = default_config()
     
     # Get tickers
     if args.tickers:
         tickers = args.tickers
     elif args.list:
-        # Import the specified list from companies.py
-        from companies import __dict__ as companies_dict
-        if args.list in companies_dict:
-            tickers = companies_dict[args.list]
-        else:
+        # Look up the specified list from companies.py
+        try:
+            tickers = list(get_universe(args.list))
+        except KeyError:
             print(f"Error: List '{args.list}' not found in companies.py")
-            print("Available lists:", [k for k in companies_dict.keys() if isinstance(companies_dict[k], list)])
+            print("Available lists:", list_universes())
             sys.exit(1)
     else:
         # Use default from companies.py
@@ -239,10 +231,7 @@ def main():
     try:
         if args.weekly_signals:
             # Run weekly signal generation only
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            data = loop.run_until_complete(system.fetch_data(tickers))
-            loop.close()
+            data = asyncio.run(system.fetch_data(tickers))
             
             signals = system.signal_generator.generate_signals(data)
             if not signals.empty:
@@ -259,7 +248,7 @@ def main():
         else:
             # Run full analysis
             results = system.run_analysis(tickers)
-            system.display_results(results)
+            system.display_results(results, export=args.export)
     except Exception as e:
         logger.error(f"Analysis failed: {e}", exc_info=True)
         sys.exit(1)
@@ -3,16 +3,83 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 from scipy.optimize import minimize
-from scipy.cluster.hierarchy import linkage, dendrogram, fcluster
+from scipy.cluster.hierarchy import linkage, leaves_list, dendrogram, fcluster
 from scipy.spatial.distance import squareform
 
 from config import PortfolioConfig
+from jit import njit
 
 logger = logging.getLogger(__name__)
 
+_RISK_PARITY_MAX_SWEEPS = 1000
+_RISK_PARITY_TOL = 1e-8
+
+@njit(cache=True, fastmath=True)
+def _risk_parity_ccd(sigma, budget, initial_weights, tol, max_sweeps):
+    """Cyclical coordinate descent for x_i * (sigma @ x)_i = budget_i (Spinu 2013)"""
+    diag = np.diag(sigma).copy()
+    marginal = sigma @ initial_weights
+    
+    # The solution has x @ sigma @ x = sum(budget), so start at that scale
+    scale = np.sqrt(budget.sum() / (initial_weights @ marginal))
+    weights = initial_weights * scale
+    marginal *= scale
+    
+    for _ in range(max_sweeps):
+        for i in range(len(weights)):
+            # Positive root of diag_i * x^2 + (marginal_i - diag_i * x_i) * x - budget_i
+            c = marginal[i] - diag[i] * weights[i]
+            updated = (np.sqrt(c * c + 4.0 * diag[i] * budget[i]) - c) / (2.0 * diag[i])
+            # Sigma is symmetric, so walk the contiguous row instead of the column
+            delta = updated - weights[i]
+            for j in range(len(weights)):
+                marginal[j] += sigma[i, j] * delta
+            weights[i] = updated
+        
+        contrib = weights * marginal
+        if np.max(np.abs(contrib / contrib.sum() - budget)) < tol:
+            return weights / weights.sum(), True
+    
+    return weights / weights.sum(), False
+
+@njit(cache=True)
+def _cluster_var(sigma, start, end):
+    """Inverse-variance portfolio volatility of the contiguous block sigma[start:end, start:end]"""
+    ivp = 1.0 / np.diag(sigma)[start:end]
+    ivp /= ivp.sum()
+    var = 0.0
+    for i in range(end - start):
+        for j in range(end - start):
+            var += ivp[i] * sigma[start + i, start + j] * ivp[j]
+    return np.sqrt(var)
+
+@njit(cache=True)
+def _hrp_bisect(sigma):
+    """Recursive bisection over a quasi-diagonally ordered covariance matrix"""
+    weights = np.ones(sigma.shape[0])
+    clusters = [(0, sigma.shape[0])]
+    
+    while len(clusters) > 0:
+        start, end = clusters.pop()
+        if end - start > 1:
+            # Split into two contiguous sub-clusters
+            mid = start + (end - start) // 2
+            var_left = _cluster_var(sigma, start, mid)
+            var_right = _cluster_var(sigma, mid, end)
+            
+            # Allocate weights inversely proportional to variance
+            alpha = 1 - var_left / (var_left + var_right)
+            weights[start:mid] *= alpha
+            weights[mid:end] *= 1 - alpha
+            
+            clusters.append((start, mid))
+            clusters.append((mid, end))
+    
+    return weights
+
 class PortfolioOptimizer:
     """Portfolio optimization using various methods"""
     
@@ -20,14 +87,20 @@ class PortfolioOptimizer:
         self.config = config
         
     def optimize_portfolio(self, expected_returns: pd.Series, 
-                         covariance_matrix: pd.DataFrame,
+                         covariance_matrix: Union[pd.DataFrame, np.ndarray],
                          current_weights: Optional[pd.Series] = None) -> pd.Series:
         """Main portfolio optimization function"""
         
+        # Bare arrays are ordered like expected_returns
+        if isinstance(covariance_matrix, np.ndarray):
+            covariance_matrix = pd.DataFrame(covariance_matrix,
+                                             index=expected_returns.index,
+                                             columns=expected_returns.index)
+        
         if self.config.optimization_method == "equal_weight":
             return self._equal_weight(expected_returns)
         elif self.config.optimization_method == "risk_parity":
-            return self._risk_parity(covariance_matrix)
+            return self._risk_parity(covariance_matrix, current_weights)
         elif self.config.optimization_method == "mean_variance":
             return self._mean_variance(expected_returns, covariance_matrix)
         elif self.config.optimization_method == "hierarchical_risk_parity":
@@ -42,38 +115,42 @@ class PortfolioOptimizer:
         weights = pd.Series(1.0 / n_assets, index=expected_returns.index)
         return self._apply_constraints(weights)
     
-    def _risk_parity(self, covariance_matrix: pd.DataFrame) -> pd.Series:
-        """Risk parity optimization"""
-        n_assets = len(covariance_matrix)
-        
-        # Initial guess
-        x0 = np.ones(n_assets) / n_assets
-        
-        # Objective function: minimize difference in risk contributions
-        def objective(weights):
-            portfolio_vol = np.sqrt(weights @ covariance_matrix @ weights)
-            marginal_contrib = covariance_matrix @ weights
-            contrib = weights * marginal_contrib / portfolio_vol
-            
-            # Target equal risk contribution
-            target_contrib = 1.0 / n_assets
-            return np.sum((contrib - target_contrib) ** 2)
-        
-        # Constraints
-        constraints = [
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0},  # Sum to 1
-        ]
-        
-        # Bounds
-        bounds = [(0, self.config.max_position_size) for _ in range(n_assets)]
-        
-        # Optimize
-        result = minimize(objective, x0, method='SLSQP', 
-                         bounds=bounds, constraints=constraints)
+    def _warm_start(self, index: pd.Index, current_weights: Optional[pd.Series]) -> Optional[np.ndarray]:
+        """Current weights aligned to index as a starting point, or None if there are none"""
+        if current_weights is None or current_weights.empty:
+            return None
+        x0 = current_weights.reindex(index, fill_value=0.0).to_numpy(dtype=np.float64)
+        x0 = np.clip(np.nan_to_num(x0), 0.0, self.config.max_position_size)
+        return x0 if x0.sum() > 0 else None
+    
+    def _risk_parity(self, covariance_matrix: pd.DataFrame,
+                     current_weights: Optional[pd.Series] = None) -> pd.Series:
+        """Risk parity optimization
+        
+        Solves for true equal risk contribution, then caps positions at max_position_size.
+        The earlier SLSQP objective compared volatility-scaled contributions with 1/n, which
+        pushed most weights to the cap instead, so results differ from versions using it.
+        """
+        sigma = np.ascontiguousarray(covariance_matrix.to_numpy(dtype=np.float64))
+        n_assets = len(sigma)
+        
+        # Target equal risk contribution
+        budget = np.full(n_assets, 1.0 / n_assets)
+        
+        if np.all(np.isfinite(sigma)) and np.all(np.diag(sigma) > 0):
+            # Start from the current portfolio when there is one, else inverse volatility
+            x0 = self._warm_start(covariance_matrix.index, current_weights)
+            if x0 is None:
+                x0 = 1.0 / np.sqrt(np.diag(sigma))
+            weights, converged = _risk_parity_ccd(sigma, budget, x0, _RISK_PARITY_TOL,
+                                                  _RISK_PARITY_MAX_SWEEPS)
+        else:
+            converged = False
         
-        if result.success:
-            weights = pd.Series(result.x, index=covariance_matrix.index)
-            return self._apply_constraints(weights)
+        if converged:
+            # The solve itself is unbounded, so enforce max_position_size afterwards
+            weights = pd.Series(weights, index=covariance_matrix.index)
+            return self._water_fill(self._apply_constraints(weights))
         else:
             logger.warning("Risk parity optimization failed, using equal weight")
             return self._equal_weight(pd.Series(index=covariance_matrix.index))
@@ -86,31 +163,38 @@ class PortfolioOptimizer:
         # Initial guess
         x0 = np.ones(n_assets) / n_assets
         
+        # Plain arrays shared by the objective, the constraints and their gradients
+        sigma = covariance_matrix.to_numpy(dtype=np.float64)
+        mu = expected_returns.to_numpy(dtype=np.float64)
+        ones = np.ones(n_assets)
+        
         # Target return (can be adjusted)
-        target_return = expected_returns.mean()
+        target_return = mu.mean()
         
-        # Objective: minimize portfolio variance
+        # Objective: minimize portfolio variance (value and analytic gradient)
         def objective(weights):
-            return weights @ covariance_matrix @ weights
+            marginal = sigma @ weights
+            return weights @ marginal, 2.0 * marginal
         
         # Constraints
         constraints = [
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0},  # Sum to 1
-            {'type': 'ineq', 'fun': lambda x: x @ expected_returns - target_return}  # Min return
+            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0, 'jac': lambda x: ones},  # Sum to 1
+            {'type': 'ineq', 'fun': lambda x: x @ mu - target_return, 'jac': lambda x: mu}  # Min return
         ]
         
         # Add volatility constraint if specified
         if self.config.target_volatility > 0:
             constraints.append({
                 'type': 'ineq', 
-                'fun': lambda x: self.config.target_volatility**2 - x @ covariance_matrix @ x
+                'fun': lambda x: self.config.target_volatility**2 - x @ sigma @ x,
+                'jac': lambda x: -2.0 * (sigma @ x)
             })
         
         # Bounds
         bounds = [(0, self.config.max_position_size) for _ in range(n_assets)]
         
         # Optimize
-        result = minimize(objective, x0, method='SLSQP', 
+        result = minimize(objective, x0, method='SLSQP', jac=True,
                          bounds=bounds, constraints=constraints)
         
         if result.success:
@@ -122,103 +206,80 @@ class PortfolioOptimizer:
     
     def _hierarchical_risk_parity(self, covariance_matrix: pd.DataFrame) -> pd.Series:
         """Hierarchical Risk Parity (HRP) optimization"""
+        sigma = covariance_matrix.to_numpy(dtype=np.float64)
+        
         # Convert covariance to correlation
-        std = np.sqrt(np.diag(covariance_matrix))
-        corr_matrix = covariance_matrix / np.outer(std, std)
+        std = np.sqrt(np.diag(sigma))
+        corr = sigma / np.outer(std, std)
         
-        # Distance matrix
-        dist_matrix = np.sqrt(2 * (1 - corr_matrix))
+        # Distance matrix (clip rounding noise so near-perfect correlations stay real)
+        dist = np.sqrt(np.clip(2.0 * (1.0 - corr), 0.0, None))
+        np.fill_diagonal(dist, 0.0)
         
         # Hierarchical clustering
-        linkage_matrix = linkage(squareform(dist_matrix), method='single')
+        linkage_matrix = linkage(squareform(dist, checks=False), method='single')
         
         # Get sorted order
         sorted_idx = self._get_quasi_diag(linkage_matrix)
-        sorted_tickers = corr_matrix.index[sorted_idx].tolist()
         
-        # Recursive bisection
-        weights = self._recursive_bisection(
-            covariance_matrix.loc[sorted_tickers, sorted_tickers]
-        )
+        # Recursive bisection, scattered back to the original order
+        weights = np.empty(len(sigma))
+        weights[sorted_idx] = _hrp_bisect(np.ascontiguousarray(sigma[np.ix_(sorted_idx, sorted_idx)]))
         
-        # Return weights in original order
-        return self._apply_constraints(weights.loc[covariance_matrix.index])
+        return self._apply_constraints(pd.Series(weights, index=covariance_matrix.index))
     
     def _get_quasi_diag(self, link):
         """Get quasi-diagonal ordering from linkage matrix"""
-        link = link.astype(int)
-        sorted_idx = []
-        clusters = {i: [i] for i in range(link.shape[0] + 1)}
-        
-        for i in range(link.shape[0]):
-            cluster1 = int(link[i, 0])
-            cluster2 = int(link[i, 1])
-            
-            # Form new cluster
-            new_cluster = clusters[cluster1] + clusters[cluster2]
-            clusters[link.shape[0] + i + 1] = new_cluster
-            
-            # Remove old clusters
-            del clusters[cluster1]
-            del clusters[cluster2]
-        
-        # Get final ordering
-        sorted_idx = list(clusters.values())[0]
-        return sorted_idx
-    
-    def _recursive_bisection(self, cov: pd.DataFrame) -> pd.Series:
-        """Recursive bisection for HRP"""
-        weights = pd.Series(1.0, index=cov.index)
-        clusters = [cov.index.tolist()]
-        
-        while len(clusters) > 0:
-            clusters = [c[1:] + [c[0]] for c in clusters]  # rotate
-            
-            cluster = clusters.pop()
-            if len(cluster) > 1:
-                # Split into two sub-clusters
-                n = len(cluster) // 2
-                left = cluster[:n]
-                right = cluster[n:]
-                
-                # Calculate variance of each sub-cluster
-                var_left = self._get_cluster_var(cov.loc[left, left])
-                var_right = self._get_cluster_var(cov.loc[right, right])
-                
-                # Allocate weights inversely proportional to variance
-                alpha = 1 - var_left / (var_left + var_right)
-                
-                weights[left] *= alpha
-                weights[right] *= (1 - alpha)
-                
-                clusters.append(left)
-                clusters.append(right)
-        
-        return weights
-    
-    def _get_cluster_var(self, cov: pd.DataFrame) -> float:
-        """Calculate variance of a cluster using inverse variance weighting"""
-        ivp = 1 / np.diag(cov)
-        ivp /= ivp.sum()
-        return np.sqrt(ivp @ cov @ ivp)
+        return leaves_list(link)
     
     def _apply_constraints(self, weights: pd.Series) -> pd.Series:
         """Apply position size constraints"""
+        w = np.array(weights.to_numpy(dtype=np.float64))
+        
         # Apply max position size
-        weights = weights.clip(upper=self.config.max_position_size)
+        np.clip(w, None, self.config.max_position_size, out=w)
         
         # Apply min position size (set to 0 if below minimum)
-        weights[weights < self.config.min_position_size] = 0
+        w[w < self.config.min_position_size] = 0.0
         
         # Renormalize
-        if weights.sum() > 0:
-            weights = weights / weights.sum()
+        total = np.nansum(w)
+        if total > 0:
+            w /= total
         else:
             # Fallback to equal weight
-            n_assets = len(weights)
-            weights = pd.Series(1.0 / n_assets, index=weights.index)
+            w.fill(1.0 / w.size)
+        
+        return pd.Series(w, index=weights.index)
+    
+    def _water_fill(self, weights: pd.Series) -> pd.Series:
+        """Cap positions at max_position_size, handing the excess to uncapped positions pro rata"""
+        w = weights.to_numpy(dtype=np.float64, copy=True)
+        cap = self.config.max_position_size
+        
+        # Every pass caps at least one more position, so n passes always suffice
+        for _ in range(w.size):
+            over = w > cap
+            excess = (w[over] - cap).sum()
+            if not excess > 1e-12:
+                break
+            w[over] = cap
+            
+            free = (w > 0) & (w < cap)
+            room = w[free].sum()
+            if room > 0:
+                w[free] += excess * w[free] / room
+                continue
+            
+            # Every held position is capped: reopen dropped ones equally rather than breach the cap
+            free = w < cap
+            if not free.any():
+                logger.warning(f"{w.size} positions cannot sum to 1 under a {cap:.1%} cap")
+                w /= w.sum()
+                break
+            w[free] += excess / np.count_nonzero(free)
         
-        return weights
+        return pd.Series(w, index=weights.index)
     
     def apply_sector_constraints(self, weights: pd.Series, 
                                sector_mapping: Dict[str, str]) -> pd.Series:
@@ -226,44 +287,28 @@ class PortfolioOptimizer:
         if not sector_mapping:
             return weights
             
-        # Calculate sector weights
-        sector_weights = {}
-        for ticker, weight in weights.items():
-            sector = sector_mapping.get(ticker, 'Unknown')
-            sector_weights[sector] = sector_weights.get(sector, 0) + weight
-        
-        # Check if any sector exceeds limit
-        needs_rebalancing = False
-        for sector, sector_weight in sector_weights.items():
-            if sector_weight > self.config.max_sector_weight:
-                needs_rebalancing = True
-                break
-        
-        if not needs_rebalancing:
-            return weights
+        # Calculate each position's sector weight
+        sectors = weights.index.map(lambda ticker: sector_mapping.get(ticker, 'Unknown'))
+        sector_weights = weights.groupby(sectors).transform('sum').to_numpy(dtype=np.float64)
         
-        # Rebalance by scaling down overweight sectors
-        adjusted_weights = weights.copy()
+        # Scale down all positions in overweight sectors
+        with np.errstate(divide='ignore'):
+            scale_factor = np.minimum(1.0, self.config.max_sector_weight / sector_weights)
         
-        for sector, sector_weight in sector_weights.items():
-            if sector_weight > self.config.max_sector_weight:
-                # Scale down all positions in this sector
-                scale_factor = self.config.max_sector_weight / sector_weight
-                
-                for ticker, weight in weights.items():
-                    if sector_mapping.get(ticker) == sector:
-                        adjusted_weights[ticker] *= scale_factor
+        if (scale_factor == 1.0).all():
+            return weights
         
         # Renormalize
-        return adjusted_weights / adjusted_weights.sum()
+        values = weights.to_numpy(dtype=np.float64) * scale_factor
+        return pd.Series(values / np.nansum(values), index=weights.index)
     
     def calculate_turnover(self, new_weights: pd.Series, 
                           current_weights: pd.Series) -> float:
         """Calculate portfolio turnover"""
         # Align indices
         all_tickers = new_weights.index.union(current_weights.index)
-        new_aligned = new_weights.reindex(all_tickers, fill_value=0)
-        current_aligned = current_weights.reindex(all_tickers, fill_value=0)
+        new_aligned = new_weights.reindex(all_tickers, fill_value=0).to_numpy(dtype=np.float64)
+        current_aligned = current_weights.reindex(all_tickers, fill_value=0).to_numpy(dtype=np.float64)
         
         # Calculate turnover (sum of absolute changes / 2)
         turnover = np.abs(new_aligned - current_aligned).sum() / 2
@@ -282,28 +327,22 @@ class PortfolioOptimizer:
             return new_weights
         
         # Scale back changes to meet turnover constraint
-        logger.info(f"Turnover {turnover:.1%} exceeds limit {self.config.max_turnover:.1%}, scaling back")
+        logger.info("Turnover %.1f%% exceeds limit %.1f%%, scaling back",
+                    turnover * 100, self.config.max_turnover * 100)
         
         # Blend old and new weights
         blend_factor = self.config.max_turnover / turnover
         
         all_tickers = new_weights.index.union(current_weights.index)
-        blended_weights = pd.Series(index=all_tickers, dtype=float)
+        old_aligned = current_weights.reindex(all_tickers, fill_value=0).to_numpy(dtype=np.float64)
+        new_aligned = new_weights.reindex(all_tickers, fill_value=0).to_numpy(dtype=np.float64)
         
-        for ticker in all_tickers:
-            old_weight = current_weights.get(ticker, 0)
-            new_weight = new_weights.get(ticker, 0)
-            
-            if old_weight > new_weight:
-                # Selling
-                blended_weights[ticker] = old_weight - blend_factor * (old_weight - new_weight)
-            else:
-                # Buying
-                blended_weights[ticker] = old_weight + blend_factor * (new_weight - old_weight)
+        # Move each position the same fraction of the way (buying and selling alike)
+        blended = old_aligned + blend_factor * (new_aligned - old_aligned)
         
         # Renormalize
-        blended_weights = blended_weights[blended_weights > 0]
-        return blended_weights / blended_weights.sum()
+        held = blended > 0
+        return pd.Series(blended[held] / blended[held].sum(), index=all_tickers[held])
     
     def get_portfolio_metrics(self, weights: pd.Series, 
                             expected_returns: pd.Series,
@@ -311,24 +350,23 @@ class PortfolioOptimizer:
         """Calculate portfolio metrics"""
         # Align data
         tickers = weights.index
-        weights_aligned = weights.loc[tickers]
-        returns_aligned = expected_returns.loc[tickers]
-        cov_aligned = covariance_matrix.loc[tickers, tickers]
+        weights_aligned = weights.to_numpy(dtype=np.float64)
+        returns_aligned = expected_returns.reindex(tickers).to_numpy(dtype=np.float64)
+        cov_aligned = covariance_matrix.reindex(index=tickers, columns=tickers).to_numpy(dtype=np.float64)
         
         # Portfolio return
         portfolio_return = weights_aligned @ returns_aligned
         
         # Portfolio volatility
-        portfolio_variance = weights_aligned @ cov_aligned @ weights_aligned
+        marginal_contrib = cov_aligned @ weights_aligned
+        portfolio_variance = weights_aligned @ marginal_contrib
         portfolio_volatility = np.sqrt(portfolio_variance)
         
         # Sharpe ratio
         sharpe_ratio = (portfolio_return - self.config.risk_free_rate) / portfolio_volatility
         
         # Risk contributions
-        marginal_contrib = cov_aligned @ weights_aligned
-        total_contrib = weights_aligned @ marginal_contrib
-        risk_contrib = weights_aligned * marginal_contrib / np.sqrt(total_contrib)
+        risk_contrib = weights_aligned * marginal_contrib / portfolio_volatility
         
         # Concentration metrics
         effective_n = 1 / (weights_aligned ** 2).sum()  # Effective number of assets
@@ -338,7 +376,7 @@ class PortfolioOptimizer:
             'expected_return': portfolio_return,
             'volatility': portfolio_volatility,
             'sharpe_ratio': sharpe_ratio,
-            'risk_contributions': risk_contrib.to_dict(),
+            'risk_contributions': dict(zip(tickers, risk_contrib)),
             'effective_n_assets': effective_n,
             'max_weight': max_weight,
             'n_positions': (weights_aligned > 0).sum()
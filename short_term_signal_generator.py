@@ -4,10 +4,11 @@ Generate 1-week trade ideas based on short-term factors and recent ranking moves
 """
 
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import logging
 
+from factor_calculator import split_factor_column
+
 logger = logging.getLogger(__name__)
 
 class ShortTermSignalGenerator:
@@ -36,8 +37,7 @@ class ShortTermSignalGenerator:
             return pd.DataFrame()
 
         # --- 1) compute short-term factors ---------------------------
-        st_mom   = self.factor_calc.calculate_momentum_factors(prices)
-        st_vol   = self.factor_calc.calculate_volatility_factors(prices)
+        st_mom, st_vol = self.factor_calc.calculate_short_term_factors(prices)
         factors  = pd.concat([st_mom, st_vol], axis=1).dropna(how="all")
 
         # --- 2) latest composite scores ------------------------------
@@ -49,44 +49,19 @@ class ShortTermSignalGenerator:
         logger.info(f"Factors DataFrame columns (first 5): {list(factors.columns[:5]) if len(factors.columns) > 0 else 'No columns'}")
         logger.info(f"Factors DataFrame index (first 5): {factors.index[:5].tolist() if len(factors) > 0 else 'Empty'}")
         
-        # Get latest values for each ticker
-        latest_factors = factors.iloc[-1] if not factors.empty else pd.Series()
-        logger.info(f"Latest factors shape: {latest_factors.shape if hasattr(latest_factors, 'shape') else 'N/A'}")
-        
-        # Group by ticker and calculate mean score
-        ticker_scores = {}
+        # Columns are factor_window_ticker (e.g., momentum_5d_AAPL); split off the ticker once
+        factors.columns = pd.MultiIndex.from_tuples(
+            [split_factor_column(str(col)) for col in factors.columns], names=['factor', 'ticker'])
         
-        # Columns should be in format: factor_window_ticker (e.g., momentum_5d_AAPL)
-        for col in factors.columns:
-            col_str = str(col)
-            
-            # Extract ticker - it should be the last part after the last underscore
-            parts = col_str.split('_')
-            if len(parts) >= 3:  # e.g., momentum_5d_AAPL or volatility_20d_MSFT
-                ticker = parts[-1]  # Last part is the ticker
-                factor_type = '_'.join(parts[:-1])  # Everything else is the factor name
-                logger.debug(f"Column: {col_str} -> Factor: {factor_type}, Ticker: {ticker}")
-            else:
-                logger.warning(f"Unexpected column format: {col_str}")
-                continue
-            
-            # Ensure ticker exists in our price data
-            if ticker not in prices.columns:
-                logger.warning(f"Ticker {ticker} from factor column not found in price data")
-                continue
-                
-            if ticker not in ticker_scores:
-                ticker_scores[ticker] = []
-            
-            value = latest_factors[col]
-            if pd.notna(value):  # Only add non-NaN values
-                ticker_scores[ticker].append(value)
+        # Get latest values for each ticker
+        latest_factors = factors.iloc[-1] if not factors.empty else pd.Series(index=factors.columns, dtype=float)
+        logger.info(f"Latest factors shape: {latest_factors.shape}")
         
-        logger.info(f"Extracted tickers: {list(ticker_scores.keys())}")
-        logger.info(f"Score counts per ticker: {dict((t, len(s)) for t, s in ticker_scores.items())}")
+        # Mean of the non-NaN factor scores per ticker, restricted to tickers we have prices for
+        latest = latest_factors.groupby(level='ticker').mean().dropna()
+        latest = latest[latest.index.isin(prices.columns)]
+        logger.info(f"Extracted tickers: {latest.index.tolist()}")
         
-        # Calculate mean score for each ticker
-        latest = pd.Series({ticker: np.nanmean(scores) for ticker, scores in ticker_scores.items() if scores})
         latest = latest.sort_values(ascending=False)
         logger.info(f"Final composite scores (top 10):\n{latest.head(10)}")
 
@@ -119,5 +94,7 @@ class ShortTermSignalGenerator:
 
     # ---------- helpers ----------
     def _aligned_closes(self, data: dict) -> pd.DataFrame:
-        close_dict = {t: d['prices']['Close'] for t, d in data.items() if 'prices' in d}
-        return pd.DataFrame(close_dict).ffill(limit=2)
\ No newline at end of file
+        closes = [d['prices']['Close'].rename(t) for t, d in data.items() if 'prices' in d]
+        if not closes:
+            return pd.DataFrame()
+        return pd.concat(closes, axis=1).ffill(limit=2)
\ No newline at end of file
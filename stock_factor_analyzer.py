@@ -3,156 +3,345 @@
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import talib
+from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+import msgspec
+import os
 import warnings
+
+from data_fetcher import Fundamentals, _content_hash, _msgpack_encoder, _statement_to_feather
+from jit import njit
 warnings.filterwarnings('ignore')
 
+# Every factor the calculate_*_factors methods can produce, in output column order
+FACTOR_NAMES = (
+    # Technical
+    'momentum_1m', 'momentum_3m', 'momentum_6m', 'momentum_12m',
+    'volatility_30d', 'volatility_90d', 'rsi', 'macd_signal',
+    'price_to_sma20', 'price_to_sma50', 'volume_ratio',
+    # Fundamental
+    'pe_ratio', 'pb_ratio', 'ps_ratio', 'peg_ratio', 'ev_ebitda',
+    'roe', 'roa', 'profit_margin', 'operating_margin',
+    'revenue_growth', 'earnings_growth',
+    'debt_to_equity', 'current_ratio', 'quick_ratio',
+    'market_cap', 'enterprise_value',
+    # Quality
+    'beta', 'dividend_yield', 'recommendation_score', 'target_price_upside',
+)
+_FACTOR_COLUMN = {name: i for i, name in enumerate(FACTOR_NAMES)}
+
+def _decile_scores(values):
+    """1-10 decile of each value's first-occurrence rank, as pd.qcut(rank(method='first'), 10)
+    
+    Works down each column of a 2-D array; NaN stays NaN and scores keep the input dtype.
+    """
+    matrix = values.reshape(len(values), -1)
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=0)
+    
+    # Ordinal ranks 1..n per column (NaN sorts last), ties broken by position
+    ranks = np.empty(matrix.shape, dtype=np.float32)
+    np.put_along_axis(ranks, np.argsort(matrix, axis=0, kind='stable'),
+                      np.arange(1, len(matrix) + 1)[:, None], axis=0)
+    
+    # Rank deciles as qcut computes them, once per distinct number of valid values
+    edges = np.full((matrix.shape[1], 11), np.nan)
+    for n in np.unique(counts[counts > 0]):
+        edges[counts == n] = np.quantile(np.arange(1, n + 1), np.linspace(0, 1, 11))
+    
+    # Right-closed bins, the lowest one including its left edge
+    bins = np.maximum((edges[None, :, :] < ranks[:, :, None]).sum(axis=2), 1)
+    scores = np.where(valid, bins, np.nan).astype(values.dtype, copy=False)
+    return scores.reshape(values.shape)
+
+def _percent(info, key):
+    """info[key] scaled to percent, 0 when missing or zero"""
+    value = info.get(key)
+    return value * 100 if value else 0
+
+@njit(cache=True)
+def _annualized_std(returns):
+    """Sample standard deviation (ddof=1) in annualized percent; NaN below two values"""
+    n = len(returns)
+    if n < 2:
+        return np.nan
+    
+    # Welford's single pass: running mean and sum of squared deviations, no temporaries
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        delta = returns[i] - mean
+        mean += delta / (i + 1)
+        m2 += delta * (returns[i] - mean)
+    return np.sqrt(m2 / (n - 1)) * np.sqrt(252) * 100
+
+@njit(cache=True)
+def _tech_numeric(close, volume):
+    """Momentum, volatility and volume-ratio factors in one compiled pass
+    
+    Returns (momentum_1m, momentum_3m, momentum_6m, momentum_12m,
+    volatility_30d, volatility_90d, volume_ratio).
+    """
+    n = len(close)
+    
+    # Price momentum factors
+    momentum = np.zeros(4)
+    for i, lag in enumerate((21, 63, 126, 252)):
+        if n > lag:
+            momentum[i] = (close[n - 1] / close[n - lag] - 1) * 100
+    
+    # Last 90 non-NaN daily returns, oldest first
+    recent = np.empty(90)
+    count = 0
+    i = n - 1
+    while i > 0 and count < 90:
+        r = (close[i] - close[i - 1]) / close[i - 1]
+        if not np.isnan(r):
+            count += 1
+            recent[90 - count] = r
+        i -= 1
+    recent = recent[90 - count:]
+    
+    # Volume analysis
+    window = volume[n - 30:] if n > 30 else volume
+    avg_volume_30d = window.sum() / len(window) if len(window) > 0 else np.nan
+    volume_ratio = volume[n - 1] / avg_volume_30d if avg_volume_30d > 0 else 1.0
+    
+    return (momentum[0], momentum[1], momentum[2], momentum[3],
+            _annualized_std(recent[-30:]), _annualized_std(recent), volume_ratio)
+
+def _technical_factors(ticker, ticker_data):
+    """Calculate technical analysis factors"""
+    import talib
+    
+    try:
+        hist = ticker_data['history']
+        close = hist['Close'].values
+        high = hist['High'].values
+        low = hist['Low'].values
+        volume = hist['Volume'].values
+        
+        factors = {}
+        
+        # Momentum, volatility and volume ratio (compiled)
+        (factors['momentum_1m'], factors['momentum_3m'], factors['momentum_6m'],
+         factors['momentum_12m'], factors['volatility_30d'], factors['volatility_90d'],
+         volume_ratio) = _tech_numeric(close.astype(np.float64), volume.astype(np.float64))
+        
+        # Technical indicators
+        factors['rsi'] = talib.RSI(close)[-1] if len(close) > 14 else 50
+        macd, macd_signal, _ = talib.MACD(close)
+        factors['macd_signal'] = 1 if macd[-1] > macd_signal[-1] else 0
+        
+        # Moving average ratios (only the latest SMA is needed, so average the last window)
+        sma_20 = close[-20:].mean() if len(close) > 20 else close[-1]
+        sma_50 = close[-50:].mean() if len(close) > 50 else close[-1]
+        factors['price_to_sma20'] = (close[-1] / sma_20 - 1) * 100
+        factors['price_to_sma50'] = (close[-1] / sma_50 - 1) * 100
+        
+        factors['volume_ratio'] = volume_ratio
+        
+        return factors
+        
+    except Exception as e:
+        print(f"Error calculating technical factors for {ticker}: {e}")
+        return {}
+
+def _fundamental_factors(ticker, ticker_data):
+    """Calculate fundamental analysis factors"""
+    try:
+        info = ticker_data['info']
+        if not isinstance(info, dict):  # materialize once so every lookup is a plain dict get
+            info = dict(info)
+        factors = {}
+        
+        # Valuation ratios
+        factors['pe_ratio'] = info.get('trailingPE', 0)
+        factors['pb_ratio'] = info.get('priceToBook', 0)
+        factors['ps_ratio'] = info.get('priceToSalesTrailing12Months', 0)
+        factors['peg_ratio'] = info.get('pegRatio', 0)
+        factors['ev_ebitda'] = info.get('enterpriseToEbitda', 0)
+        
+        # Profitability ratios
+        factors['roe'] = _percent(info, 'returnOnEquity')
+        factors['roa'] = _percent(info, 'returnOnAssets')
+        factors['profit_margin'] = _percent(info, 'profitMargins')
+        factors['operating_margin'] = _percent(info, 'operatingMargins')
+        
+        # Growth metrics
+        factors['revenue_growth'] = _percent(info, 'revenueGrowth')
+        factors['earnings_growth'] = _percent(info, 'earningsGrowth')
+        
+        # Financial strength
+        factors['debt_to_equity'] = info.get('debtToEquity', 0)
+        factors['current_ratio'] = info.get('currentRatio', 0)
+        factors['quick_ratio'] = info.get('quickRatio', 0)
+        
+        # Market metrics
+        factors['market_cap'] = info.get('marketCap', 0) / 1e9  # in billions
+        factors['enterprise_value'] = info.get('enterpriseValue', 0) / 1e9  # in billions
+        
+        return factors
+        
+    except Exception as e:
+        print(f"Error calculating fundamental factors for {ticker}: {e}")
+        return {}
+
+def _quality_factors(ticker, ticker_data):
+    """Calculate quality factors"""
+    try:
+        info = ticker_data['info']
+        if not isinstance(info, dict):  # materialize once so every lookup is a plain dict get
+            info = dict(info)
+        factors = {}
+        
+        # Stability metrics
+        factors['beta'] = info.get('beta', 1)
+        factors['dividend_yield'] = _percent(info, 'dividendYield')
+        
+        # Analyst sentiment
+        factors['recommendation_score'] = info.get('recommendationMean', 3)  # 1=Strong Buy, 5=Strong Sell
+        factors['target_price_upside'] = 0
+        target_price, current_price = info.get('targetMeanPrice'), info.get('currentPrice')
+        if target_price and current_price:
+            factors['target_price_upside'] = (target_price / current_price - 1) * 100
+        
+        return factors
+        
+    except Exception as e:
+        print(f"Error calculating quality factors for {ticker}: {e}")
+        return {}
+
+def _all_factors(job):
+    """Technical, fundamental and quality factor dicts for one (ticker, ticker_data) job"""
+    ticker, ticker_data = job
+    return (_technical_factors(ticker, ticker_data),
+            _fundamental_factors(ticker, ticker_data),
+            _quality_factors(ticker, ticker_data))
+
 class StockFactorAnalyzer:
-    def __init__(self, tickers, period='2y'):
+    def __init__(self, tickers, period='2y', cache_dir='./data_cache', use_cache=True, n_jobs=1):
         """
         Initialize the analyzer with stock tickers and data period
         
         Args:
             tickers: List of stock symbols
             period: Data period ('1y', '2y', '5y', 'max')
+            cache_dir: Directory for the per-day download cache
+            use_cache: Reuse today's downloads instead of refetching
+            n_jobs: Worker processes for per-ticker factor calculation (-1 = all cores)
         """
         self.tickers = tickers
         self.period = period
+        self.cache_dir = Path(cache_dir)
+        self.use_cache = use_cache
+        self.n_jobs = n_jobs
         self.data = {}
         self.factor_scores = pd.DataFrame()
         
-    def fetch_data(self):
+    def _cache_paths(self, ticker):
+        """Today's cache files for a ticker: price history (Feather) and the rest (msgpack)"""
+        stem = f"{ticker}_{self.period}_{date.today():%Y%m%d}"
+        return self.cache_dir / f"{stem}.feather", self.cache_dir / f"{stem}.msgpack"
+    
+    def _load_cached(self, ticker):
+        """Today's download for a ticker, or None"""
+        history_path, info_path = self._cache_paths(ticker)
+        hash_path = info_path.with_suffix('.hash')
+        # The hash is written last, so its absence means an interrupted save
+        if not (self.use_cache and history_path.exists() and hash_path.exists()):
+            return None
+        
+        try:
+            payload = info_path.read_bytes()
+            if hash_path.read_text() != _content_hash(payload):
+                print(f"Discarding partially written cache for {ticker}")
+                return None
+            history = pd.read_feather(history_path)
+            data = Fundamentals(msgspec.msgpack.decode(payload, type=dict))
+        except Exception as e:
+            print(f"Discarding unreadable cache for {ticker}: {e}")
+            return None
+        data['history'] = history.set_index(history.columns[0])
+        return data
+    
+    def _save_cached(self, ticker, data):
+        """Store a download so later runs today skip the network"""
+        history_path, info_path = self._cache_paths(ticker)
+        try:
+            payload = _msgpack_encoder.encode({
+                'info': data['info'],
+                'financials_feather': _statement_to_feather(data['financials']),
+                'balance_sheet_feather': _statement_to_feather(data['balance_sheet'])
+            })
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            data['history'].reset_index().to_feather(history_path)
+            info_path.write_bytes(payload)
+            info_path.with_suffix('.hash').write_text(_content_hash(payload))
+        except Exception as e:
+            print(f"Could not cache {ticker}: {e}")
+    
+    def _fetch_one(self, ticker):
+        """Fetch price history, company info and statements for one ticker"""
+        cached = self._load_cached(ticker)
+        if cached is not None:
+            return cached
+        
+        stock = yf.Ticker(ticker)
+        
+        # Get historical price data
+        hist_data = stock.history(period=self.period)
+        
+        # Get company info
+        info = stock.info
+        
+        # Get financials
+        financials = stock.financials
+        balance_sheet = stock.balance_sheet
+        
+        data = {
+            'history': hist_data,
+            'info': info,
+            'financials': financials,
+            'balance_sheet': balance_sheet
+        }
+        if self.use_cache:
+            self._save_cached(ticker, data)
+        return data
+    
+    def fetch_data(self, max_workers=16):
         """Fetch historical data and company info for all tickers"""
         print("Fetching data...")
         
+        # yfinance calls are network-bound, so fetch tickers concurrently
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(self.tickers)))) as executor:
+            futures = {executor.submit(self._fetch_one, ticker): ticker for ticker in self.tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    fetched[ticker] = future.result()
+                    print(f"✓ Fetched data for {ticker}")
+                except Exception as e:
+                    print(f"✗ Error fetching {ticker}: {e}")
+        
+        # Keep ticker order so rank ties break the same way on every run
         for ticker in self.tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                
-                # Get historical price data
-                hist_data = stock.history(period=self.period)
-                
-                # Get company info
-                info = stock.info
-                
-                # Get financials
-                financials = stock.financials
-                balance_sheet = stock.balance_sheet
-                
-                self.data[ticker] = {
-                    'history': hist_data,
-                    'info': info,
-                    'financials': financials,
-                    'balance_sheet': balance_sheet
-                }
-                
-                print(f"✓ Fetched data for {ticker}")
-                
-            except Exception as e:
-                print(f"✗ Error fetching {ticker}: {e}")
+            if ticker in fetched:
+                self.data[ticker] = fetched[ticker]
                 
     def calculate_technical_factors(self, ticker):
         """Calculate technical analysis factors"""
-        try:
-            hist = self.data[ticker]['history']
-            close = hist['Close'].values
-            high = hist['High'].values
-            low = hist['Low'].values
-            volume = hist['Volume'].values
-            
-            factors = {}
-            
-            # Price momentum factors
-            factors['momentum_1m'] = (close[-1] / close[-21] - 1) * 100 if len(close) > 21 else 0
-            factors['momentum_3m'] = (close[-1] / close[-63] - 1) * 100 if len(close) > 63 else 0
-            factors['momentum_6m'] = (close[-1] / close[-126] - 1) * 100 if len(close) > 126 else 0
-            factors['momentum_12m'] = (close[-1] / close[-252] - 1) * 100 if len(close) > 252 else 0
-            
-            # Volatility
-            returns = pd.Series(close).pct_change().dropna()
-            factors['volatility_30d'] = returns.tail(30).std() * np.sqrt(252) * 100
-            factors['volatility_90d'] = returns.tail(90).std() * np.sqrt(252) * 100
-            
-            # Technical indicators
-            factors['rsi'] = talib.RSI(close)[-1] if len(close) > 14 else 50
-            factors['macd_signal'] = 1 if talib.MACD(close)[0][-1] > talib.MACD(close)[1][-1] else 0
-            
-            # Moving average ratios
-            sma_20 = talib.SMA(close, 20)[-1] if len(close) > 20 else close[-1]
-            sma_50 = talib.SMA(close, 50)[-1] if len(close) > 50 else close[-1]
-            factors['price_to_sma20'] = (close[-1] / sma_20 - 1) * 100
-            factors['price_to_sma50'] = (close[-1] / sma_50 - 1) * 100
-            
-            # Volume analysis
-            avg_volume_30d = np.mean(volume[-30:]) if len(volume) > 30 else np.mean(volume)
-            factors['volume_ratio'] = volume[-1] / avg_volume_30d if avg_volume_30d > 0 else 1
-            
-            return factors
-            
-        except Exception as e:
-            print(f"Error calculating technical factors for {ticker}: {e}")
-            return {}
+        return _technical_factors(ticker, self.data.get(ticker))
     
     def calculate_fundamental_factors(self, ticker):
         """Calculate fundamental analysis factors"""
-        try:
-            info = self.data[ticker]['info']
-            factors = {}
-            
-            # Valuation ratios
-            factors['pe_ratio'] = info.get('trailingPE', 0)
-            factors['pb_ratio'] = info.get('priceToBook', 0)
-            factors['ps_ratio'] = info.get('priceToSalesTrailing12Months', 0)
-            factors['peg_ratio'] = info.get('pegRatio', 0)
-            factors['ev_ebitda'] = info.get('enterpriseToEbitda', 0)
-            
-            # Profitability ratios
-            factors['roe'] = info.get('returnOnEquity', 0) * 100 if info.get('returnOnEquity') else 0
-            factors['roa'] = info.get('returnOnAssets', 0) * 100 if info.get('returnOnAssets') else 0
-            factors['profit_margin'] = info.get('profitMargins', 0) * 100 if info.get('profitMargins') else 0
-            factors['operating_margin'] = info.get('operatingMargins', 0) * 100 if info.get('operatingMargins') else 0
-            
-            # Growth metrics
-            factors['revenue_growth'] = info.get('revenueGrowth', 0) * 100 if info.get('revenueGrowth') else 0
-            factors['earnings_growth'] = info.get('earningsGrowth', 0) * 100 if info.get('earningsGrowth') else 0
-            
-            # Financial strength
-            factors['debt_to_equity'] = info.get('debtToEquity', 0)
-            factors['current_ratio'] = info.get('currentRatio', 0)
-            factors['quick_ratio'] = info.get('quickRatio', 0)
-            
-            # Market metrics
-            factors['market_cap'] = info.get('marketCap', 0) / 1e9  # in billions
-            factors['enterprise_value'] = info.get('enterpriseValue', 0) / 1e9  # in billions
-            
-            return factors
-            
-        except Exception as e:
-            print(f"Error calculating fundamental factors for {ticker}: {e}")
-            return {}
+        return _fundamental_factors(ticker, self.data.get(ticker))
     
     def calculate_quality_factors(self, ticker):
         """Calculate quality factors"""
-        try:
-            info = self.data[ticker]['info']
-            factors = {}
-            
-            # Stability metrics
-            factors['beta'] = info.get('beta', 1)
-            factors['dividend_yield'] = info.get('dividendYield', 0) * 100 if info.get('dividendYield') else 0
-            
-            # Analyst sentiment
-            factors['recommendation_score'] = info.get('recommendationMean', 3)  # 1=Strong Buy, 5=Strong Sell
-            factors['target_price_upside'] = 0
-            if info.get('targetMeanPrice') and info.get('currentPrice'):
-                factors['target_price_upside'] = (info['targetMeanPrice'] / info['currentPrice'] - 1) * 100
-            
-            return factors
-            
-        except Exception as e:
-            print(f"Error calculating quality factors for {ticker}: {e}")
-            return {}
+        return _quality_factors(ticker, self.data.get(ticker))
     
     def score_factors(self, factors_df):
         """Score factors on a 1-10 scale"""
@@ -198,39 +387,55 @@ class StockFactorAnalyzer:
             'target_price_upside': 'percentile',
         }
         
-        for factor, rule in scoring_rules.items():
-            if factor in scored_df.columns:
-                scored_df[f'{factor}_score'] = self.apply_scoring_rule(factors_df[factor], rule)
+        factors = [factor for factor in scoring_rules if factor in scored_df.columns]
+        if not factors:
+            return scored_df
         
-        return scored_df
+        # Apply each rule's transform, then rank every factor in one pass
+        adjusted = np.column_stack([
+            self._rule_values(factors_df[factor], scoring_rules[factor]) for factor in factors
+        ])
+        scores = pd.DataFrame(_decile_scores(adjusted), index=scored_df.index,
+                              columns=[f'{factor}_score' for factor in factors])
+        
+        return pd.concat([scored_df, scores], axis=1)
     
     def apply_scoring_rule(self, series, rule):
         """Apply different scoring rules"""
-        series = series.replace([np.inf, -np.inf], np.nan)
+        values = self._rule_values(series, rule)
+        if values is None:
+            return pd.Series([5] * len(series), index=series.index)  # neutral score
+        return pd.Series(_decile_scores(values), index=series.index)
+    
+    def _rule_values(self, series, rule):
+        """Values whose ascending rank gives the rule's score (None for the neutral rule)"""
+        values = series.to_numpy(dtype=np.float32, copy=True)
+        values[np.isinf(values)] = np.nan
         
         if rule == 'percentile':
-            return pd.qcut(series.rank(method='first'), 10, labels=range(1, 11)).astype(float)
+            return values
         
         elif rule == 'inverse_percentile':
-            return pd.qcut((-series).rank(method='first'), 10, labels=range(1, 11)).astype(float)
+            return -values
         
         elif rule == 'inverse_percentile_capped':
             # Cap extreme values before inverse ranking
-            capped = series.clip(upper=series.quantile(0.95))
-            return pd.qcut((-capped).rank(method='first'), 10, labels=range(1, 11)).astype(float)
+            if not np.isnan(values).all():
+                np.minimum(values, np.nanquantile(values, 0.95), out=values, where=~np.isnan(values))
+            return -values
         
         elif rule == 'mean_reversion':
             # For RSI - score higher when closer to 50
-            distance_from_50 = np.abs(series - 50)
-            return pd.qcut((-distance_from_50).rank(method='first'), 10, labels=range(1, 11)).astype(float)
+            distance_from_50 = np.abs(values - 50)
+            return -distance_from_50
         
         elif rule == 'momentum_bias':
             # Slight bias toward positive momentum
-            adjusted = series + 2  # small positive bias
-            return pd.qcut(adjusted.rank(method='first'), 10, labels=range(1, 11)).astype(float)
+            adjusted = values + 2  # small positive bias
+            return adjusted
         
         else:
-            return pd.Series([5] * len(series), index=series.index)  # neutral score
+            return None
     
     def calculate_composite_scores(self, scored_df):
         """Calculate composite factor scores"""
@@ -270,18 +475,25 @@ class StockFactorAnalyzer:
             }
         }
         
+        # Weight matrix over the available factor scores, one column per composite
+        # normalized by the weight actually present
+        factor_groups = {composite_name: {factor: weight for factor, weight in factors.items()
+                                          if factor in scored_df.columns}
+                         for composite_name, factors in factor_groups.items()}
+        factor_groups = {name: factors for name, factors in factor_groups.items() if factors}
+        
         # Calculate composite scores
-        for composite_name, factors in factor_groups.items():
-            weighted_score = 0
-            total_weight = 0
-            
-            for factor, weight in factors.items():
-                if factor in scored_df.columns:
-                    weighted_score += scored_df[factor].fillna(5) * weight
-                    total_weight += weight
+        if factor_groups:
+            columns = list(dict.fromkeys(f for factors in factor_groups.values() for f in factors))
+            row = {factor: i for i, factor in enumerate(columns)}
+            weights = np.zeros((len(columns), len(factor_groups)))
+            for j, factors in enumerate(factor_groups.values()):
+                for factor, weight in factors.items():
+                    weights[row[factor], j] = weight
+            weights /= weights.sum(axis=0)
             
-            if total_weight > 0:
-                scored_df[composite_name] = weighted_score / total_weight
+            composites = scored_df[columns].fillna(5).to_numpy(dtype=float) @ weights
+            scored_df[list(factor_groups)] = composites
         
         # Overall composite score
         composite_cols = ['value_score', 'momentum_score', 'quality_score', 'growth_score', 'technical_score']
@@ -303,21 +515,40 @@ class StockFactorAnalyzer:
             print("No data available for analysis")
             return None
         
-        # Calculate factors for each stock
-        all_factors = {}
+        # Calculate factors for each stock into one (ticker x factor) array
+        tickers = list(self.data.keys())
+        # float32: decile scoring only needs ranks, and it halves the matrix's memory traffic
+        values = np.full((len(tickers), len(FACTOR_NAMES)), np.nan, dtype=np.float32)
+        produced = np.zeros(len(FACTOR_NAMES), dtype=bool)
+        
+        # Tickers are independent and CPU-bound (TA-Lib holds the GIL), so spread them
+        # across processes when n_jobs != 1; workers only get the history and info
+        jobs = [(ticker, {'history': self.data[ticker].get('history'),
+                          'info': self.data[ticker].get('info')}) for ticker in tickers]
+        n_jobs = self.n_jobs
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        n_jobs = min(n_jobs, len(jobs))
+        
+        if n_jobs <= 1:
+            results = list(map(_all_factors, jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(_all_factors, jobs,
+                                            chunksize=max(1, len(jobs) // (4 * n_jobs))))
         
-        for ticker in self.data.keys():
+        for row, (ticker, ticker_factors) in enumerate(zip(tickers, results)):
             print(f"Analyzing {ticker}...")
             
-            factors = {}
-            factors.update(self.calculate_technical_factors(ticker))
-            factors.update(self.calculate_fundamental_factors(ticker))
-            factors.update(self.calculate_quality_factors(ticker))
-            
-            all_factors[ticker] = factors
-        
-        # Create DataFrame
-        factors_df = pd.DataFrame(all_factors).T
+            for factors in ticker_factors:
+                for name, value in factors.items():
+                    col = _FACTOR_COLUMN[name]
+                    values[row, col] = np.nan if value is None else value
+                    produced[col] = True
+        
+        # Create DataFrame (factors no ticker produced are left out, as before)
+        factors_df = pd.DataFrame(values[:, produced], index=tickers,
+                                  columns=[name for name, keep in zip(FACTOR_NAMES, produced) if keep])
         
         # Score factors
         scored_df = self.score_factors(factors_df)
@@ -3,14 +3,11 @@
 
 import pandas as pd
 import numpy as np
+import importlib.util
 import logging
 import json
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Union
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +33,7 @@ def load_config(config_path: Union[str, Path]) -> Dict:
     
     with open(config_path, 'r') as f:
         if config_path.suffix == '.yaml' or config_path.suffix == '.yml':
+            import yaml
             return yaml.safe_load(f)
         elif config_path.suffix == '.json':
             return json.load(f)
@@ -129,8 +127,25 @@ def save_results(results: Dict, output_path: Union[str, Path]):
             pickle.dump(results, f)
         logger.info(f"Results saved as pickle to {pickle_path}")
 
-def plot_backtest_results(results: Dict, save_path: Optional[Union[str, Path]] = None):
-    """Create visualization of backtest results"""
+def _returns_and_drawdown(values: np.ndarray):
+    """Daily returns (first one zero) and the drawdown from the running peak"""
+    returns = np.zeros_like(values)
+    returns[1:] = values[1:] / values[:-1] - 1
+    cumulative = np.cumprod(1 + returns)
+    drawdown = cumulative / np.maximum.accumulate(cumulative) - 1
+    return returns, drawdown
+
+def plot_backtest_results(results: Dict, save_path: Optional[Union[str, Path]] = None,
+                          dpi: int = 120, fmt: Optional[str] = None):
+    """Create visualization of backtest results
+    
+    The file format follows save_path's suffix unless fmt is given; prefer .pdf for
+    batch reports, since vector output skips rasterizing and PNG-encoding the figure.
+    """
+    # Plotting libraries are heavy; only load them when a plot is requested
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     portfolio_values = results['portfolio_values']
     metrics = results['metrics']
     
@@ -148,12 +163,10 @@ def plot_backtest_results(results: Dict, save_path: Optional[Union[str, Path]] =
     
     # 2. Drawdown chart
     ax2 = axes[0, 1]
-    returns = portfolio_values['value'].pct_change()
-    cumulative = (1 + returns).cumprod()
-    running_max = cumulative.expanding().max()
-    drawdown = (cumulative - running_max) / running_max
-    drawdown.plot(ax=ax2, color='red')
-    ax2.fill_between(drawdown.index, 0, drawdown.values, alpha=0.3, color='red')
+    dates = portfolio_values.index
+    returns, drawdown = _returns_and_drawdown(portfolio_values['value'].to_numpy(dtype=np.float64))
+    ax2.plot(dates, drawdown, color='red')
+    ax2.fill_between(dates, 0, drawdown, alpha=0.3, color='red')
     ax2.set_title('Drawdown')
     ax2.set_xlabel('Date')
     ax2.set_ylabel('Drawdown (%)')
@@ -161,9 +174,7 @@ def plot_backtest_results(results: Dict, save_path: Optional[Union[str, Path]] =
     
     # 3. Monthly returns heatmap
     ax3 = axes[1, 0]
-    monthly_returns = returns.resample('M').sum()
-    monthly_returns_pivot = monthly_returns.groupby([monthly_returns.index.year, 
-                                                    monthly_returns.index.month]).sum().unstack()
+    monthly_returns_pivot = pd.Series(returns, index=dates).groupby([dates.year, dates.month]).sum().unstack()
     sns.heatmap(monthly_returns_pivot, cmap='RdYlGn', center=0, 
                 annot=True, fmt='.1%', ax=ax3)
     ax3.set_title('Monthly Returns Heatmap')
@@ -188,16 +199,17 @@ def plot_backtest_results(results: Dict, save_path: Optional[Union[str, Path]] =
     plt.tight_layout()
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        plt.savefig(save_path, dpi=dpi, format=fmt, bbox_inches='tight')
         logger.info(f"Plot saved to {save_path}")
     
     return fig
 
-def create_tear_sheet(results: Dict, save_path: Optional[Union[str, Path]] = None):
+def create_tear_sheet(results: Dict, save_path: Optional[Union[str, Path]] = None,
+                      dpi: int = 120, fmt: Optional[str] = None):
     """Create a comprehensive tear sheet"""
     # This would create a more detailed analysis report
     # For now, using the basic plot function
-    return plot_backtest_results(results, save_path)
+    return plot_backtest_results(results, save_path, dpi=dpi, fmt=fmt)
 
 def validate_data_integrity(data: Dict[str, Dict]) -> Dict[str, List[str]]:
     """Validate data integrity and return issues"""
@@ -208,6 +220,9 @@ def validate_data_integrity(data: Dict[str, Dict]) -> Dict[str, List[str]]:
         'suspicious_values': []
     }
     
+    # One reference time for every ticker, in naive UTC like the converted price dates
+    now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+    
     for ticker, ticker_data in data.items():
         # Check for missing data
         if ticker_data.get('prices') is None or ticker_data['prices'].empty:
@@ -219,13 +234,11 @@ def validate_data_integrity(data: Dict[str, Dict]) -> Dict[str, List[str]]:
         # Check for stale data
         if ticker_data.get('prices') is not None and not ticker_data['prices'].empty:
             last_date = ticker_data['prices'].index[-1]
-            # Convert to timezone-naive for comparison
-            if hasattr(last_date, 'tz_localize'):
-                last_date_naive = last_date.tz_localize(None)
-            else:
-                last_date_naive = last_date
+            # Convert to timezone-naive UTC for comparison
+            if last_date.tzinfo is not None:
+                last_date = last_date.tz_convert(None)
             
-            days_old = (datetime.now() - last_date_naive).days
+            days_old = (now - last_date).days
             if days_old > 5:
                 issues['stale_data'].append(f"{ticker}: {days_old} days old")
         
@@ -251,45 +264,71 @@ def get_sector_mapping(tickers: List[str], data: Dict[str, Dict]) -> Dict[str, s
 
 def calculate_correlation_matrix(returns: pd.DataFrame) -> pd.DataFrame:
     """Calculate and clean correlation matrix"""
-    # Calculate correlation
-    corr_matrix = returns.corr()
+    arr = returns.to_numpy(dtype=np.float64)
     
-    # Clean up numerical issues
-    corr_matrix = corr_matrix.fillna(0)
-    np.fill_diagonal(corr_matrix.values, 1.0)
+    # Calculate correlation (pandas' pairwise-complete path only when there are gaps)
+    if np.isnan(arr).any():
+        corr = returns.corr().to_numpy(copy=True)
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.atleast_2d(np.corrcoef(arr, rowvar=False))
     
-    # Ensure symmetry
-    corr_matrix = (corr_matrix + corr_matrix.T) / 2
+    # Clean up numerical issues (both paths are already symmetric)
+    np.nan_to_num(corr, copy=False, nan=0.0)
+    np.fill_diagonal(corr, 1.0)
     
-    return corr_matrix
+    return pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+
+def _result_frames(results: Dict) -> Dict[str, pd.DataFrame]:
+    """Collect the exportable tables of a backtest result"""
+    frames = {
+        'portfolio_values': results['portfolio_values'],
+        'metrics': pd.DataFrame([results['metrics']])
+    }
+    if 'transactions' in results and results['transactions']:
+        frames['transactions'] = pd.DataFrame(results['transactions'])
+    if 'weights_history' in results and results['weights_history']:
+        frames['weights_history'] = pd.DataFrame(results['weights_history'])
+    return frames
+
+def _excel_engine() -> str:
+    """Prefer xlsxwriter, fall back to openpyxl when it isn't installed"""
+    return 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') is not None else 'openpyxl'
 
 def export_to_excel(results: Dict, output_path: Union[str, Path]):
     """Export results to Excel with multiple sheets"""
     output_path = Path(output_path)
+    sheet_names = {
+        'portfolio_values': 'Portfolio Values',
+        'metrics': 'Metrics',
+        'transactions': 'Transactions',
+        'weights_history': 'Weights History'
+    }
     
     try:
-        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-            # Portfolio values
-            results['portfolio_values'].to_excel(writer, sheet_name='Portfolio Values')
-            
-            # Metrics
-            metrics_df = pd.DataFrame([results['metrics']])
-            metrics_df.to_excel(writer, sheet_name='Metrics', index=False)
-            
-            # Transactions
-            if 'transactions' in results and results['transactions']:
-                transactions_df = pd.DataFrame(results['transactions'])
-                transactions_df.to_excel(writer, sheet_name='Transactions', index=False)
-            
-            # Weights history
-            if 'weights_history' in results and results['weights_history']:
-                weights_df = pd.DataFrame(results['weights_history'])
-                weights_df.to_excel(writer, sheet_name='Weights History', index=False)
+        with pd.ExcelWriter(output_path, engine=_excel_engine()) as writer:
+            for name, df in _result_frames(results).items():
+                # Only the portfolio values carry a meaningful (date) index
+                df.to_excel(writer, sheet_name=sheet_names[name],
+                            index=(name == 'portfolio_values'))
         
         logger.info(f"Results exported to {output_path}")
     except Exception as e:
         logger.error(f"Failed to export to Excel: {e}")
 
+def export_to_parquet(results: Dict, out_dir: Union[str, Path]):
+    """Export results as one zstd-compressed parquet file per table"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        for name, df in _result_frames(results).items():
+            df.to_parquet(out_dir / f"{name}.parquet", engine='pyarrow', compression='zstd')
+        
+        logger.info(f"Results exported to {out_dir}")
+    except Exception as e:
+        logger.error(f"Failed to export to parquet: {e}")
+
 def format_number(value: float, format_type: str = 'general') -> str:
     """Format numbers for display"""
     if pd.isna(value):
@@ -302,4 +341,20 @@ def format_number(value: float, format_type: str = 'general') -> str:
     elif format_type == 'decimal':
         return f"{value:.2f}"
     else:
-        return f"{value:.3g}"
\ No newline at end of file
+        return f"{value:.3g}"
+
+def format_numbers(values, format_type: str = 'general') -> np.ndarray:
+    """Vectorized format_number for whole columns; returns an array of strings"""
+    arr = np.asarray(values, dtype=np.float64)
+    
+    if format_type == 'percent':
+        formatted = np.char.add(np.char.mod('%.1f', arr * 100), '%')
+    elif format_type == 'currency':
+        # printf-style formats have no thousands separator
+        formatted = np.array([f"${value:,.0f}" for value in arr.ravel()], dtype=object).reshape(arr.shape)
+    elif format_type == 'decimal':
+        formatted = np.char.mod('%.2f', arr)
+    else:
+        formatted = np.char.mod('%.3g', arr)
+    
+    return np.where(np.isnan(arr), 'N/A', formatted).astype(str)
\ No newline at end of file